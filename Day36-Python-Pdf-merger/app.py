@@ -1,8 +1,23 @@
+import hashlib
+import io
+import json
+import mmap
+import multiprocessing
 import os
-from flask import Flask, render_template, request, send_file, flash
+import re
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import (Flask, Request, Response, render_template, request, send_file, flash, jsonify,
+                   stream_with_context, url_for)
 from pypdf import PdfReader, PdfWriter
 from werkzeug.utils import secure_filename
+from instrumentation import instrument, timed
 import shutil
+import tempfile
 
 # Create folders for uploads and outputs
 UPLOAD_FOLDER = "uploads"
@@ -10,22 +25,526 @@ OUTPUT_FOLDER = "outputs"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+# Content-addressed cache of parsed-PDF metadata and finished outputs
+CACHE_FOLDER = "cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+os.makedirs(CACHE_FOLDER, exist_ok=True)
+
+# Job files are kept this long (seconds) before the janitor removes them
+WORKSPACE_TTL = 60 * 60
+JANITOR_INTERVAL = 5 * 60
+
+# Results are named "<32 hex job id>-merged.pdf" / "<job id>-split.pdf"
+OUTPUT_NAME = re.compile(r"^[0-9a-f]{32}-(merged|split)\.pdf$")
+JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Uploads (and streamed results) up to this size stay in memory; larger ones
+# go to a temp file that is memory-mapped instead of copied
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Bytes of a ZIP member copied (and sent) at a time
+ZIP_CHUNK_SIZE = 256 * 1024
+
+# Processes for background jobs; PDF work is CPU bound so default to one per core
+JOB_WORKERS = int(os.environ.get("PDF_JOB_WORKERS", os.cpu_count() or 1))
+# Minimum seconds between progress writes for a running job
+PROGRESS_INTERVAL = 0.5
+
+class SpoolingRequest(Request):
+    """Keeps small uploads in memory and spools larger ones to an anonymous temp file"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= SPOOL_MAX_SIZE:
+            return io.BytesIO()
+        return tempfile.TemporaryFile("wb+")
+
 app = Flask(__name__)
+app.request_class = SpoolingRequest
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["SECRET_KEY"] = "your-secret-key-here"  # Needed for flashing messages
+instrument(app)  # per-route and per-stage timings at /metrics
 
-def clear_folder(folder):
-    """Clear all files in the specified folder"""
+@timed("clear_folder")
+def clear_folder(folder, max_age=0, keep=None):
+    """Clear files in the specified folder older than max_age seconds, except those keep(filename) spares"""
+    cutoff = time.time() - max_age
     for filename in os.listdir(folder):
         file_path = os.path.join(folder, filename)
         try:
+            if os.path.getmtime(file_path) > cutoff:
+                continue
+            if keep is not None and keep(filename):
+                continue
             if os.path.isfile(file_path) or os.path.islink(file_path):
                 os.unlink(file_path)
             elif os.path.isdir(file_path):
                 shutil.rmtree(file_path)
+        except FileNotFoundError:
+            pass  # another worker removed it first
         except Exception as e:
             print(f"Failed to delete {file_path}. Reason: {e}")
 
+def job_active(filename):
+    """True for the workspace or status file of a job that is still queued or running"""
+    job_id = filename.split(".", 1)[0]
+    if not JOB_ID.match(job_id):
+        return False
+    status = read_status(job_id)
+    return status is not None and status["status"] in ("queued", "running")
+
+def janitor():
+    """Background sweep of workspaces and results left behind by old jobs"""
+    while True:
+        time.sleep(JANITOR_INTERVAL)
+        # A job waiting in a backed-up queue still needs its inputs, however old
+        clear_folder(UPLOAD_FOLDER, WORKSPACE_TTL, keep=job_active)
+        clear_folder(OUTPUT_FOLDER, WORKSPACE_TTL, keep=job_active)
+
+# Job processes import this module too; only the web process sweeps
+if multiprocessing.parent_process() is None:
+    threading.Thread(target=janitor, daemon=True).start()
+
+def create_workspace():
+    """Give a background job its own id and upload folder so workers never collide"""
+    job_id = uuid.uuid4().hex
+    workspace = os.path.join(UPLOAD_FOLDER, job_id)
+    os.makedirs(workspace)
+    return job_id, workspace
+
+def output_name(job_id, kind):
+    return f"{job_id}-{kind}.pdf"
+
+def pdf_uploads(files):
+    """Yield (filename, upload) for each non-empty PDF upload"""
+    for file in files:
+        if file.filename == '':
+            continue
+
+        filename = secure_filename(file.filename)
+        if not filename.lower().endswith('.pdf'):
+            continue
+
+        yield filename, file
+
+@timed("upload_save")
+def save_uploads(files, workspace):
+    """Save uploaded PDFs into the workspace (background jobs read them from another process)"""
+    paths = []
+    for filename, file in pdf_uploads(files):
+        filepath = os.path.join(workspace, filename)
+        file.save(filepath)
+        paths.append(filepath)
+    return paths
+
+def upload_source(file):
+    """Something PdfReader can read an upload from without copying it again"""
+    stream = file.stream
+    if isinstance(stream, io.BytesIO):
+        return stream
+    try:
+        return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        return stream  # empty or not a real file
+
+def upload_sources(files, detach=False):
+    """(filename, source) for each PDF upload.
+
+    With detach, the request no longer owns the data, so it stays readable
+    after the view returns (the request closes its files before a streamed
+    response is sent).
+    """
+    sources = []
+    for filename, file in pdf_uploads(files):
+        sources.append((filename, upload_source(file)))
+        if detach:
+            file.stream = io.BytesIO()
+    return sources
+
+# --- Cache ---
+# Inputs are identified by the SHA-256 of their bytes. For each input we keep
+# its page count ("<digest>.meta.json"); for each finished merge/split we keep
+# the output ("<key>.pdf"), keyed by the operation, input digests and page
+# range. A repeat request is then answered from the cache without pypdf.
+# Entries are files, so every web worker and job process shares them; the
+# least recently used are evicted once the folder passes CACHE_MAX_BYTES.
+
+@timed("hash")
+def content_hash(source):
+    digest = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    elif isinstance(source, io.BytesIO):
+        with source.getbuffer() as view:
+            digest.update(view)
+    elif isinstance(source, mmap.mmap):
+        digest.update(source)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+def cache_key(operation, digests, *args):
+    return hashlib.sha256(json.dumps([operation, digests, *args]).encode()).hexdigest()
+
+def cache_path(name):
+    return os.path.join(CACHE_FOLDER, name)
+
+def link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if isinstance(e, FileNotFoundError):
+            raise
+        shutil.copyfile(src, dst)  # different filesystem
+
+def read_meta(digest):
+    try:
+        with open(cache_path(f"{digest}.meta.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def write_meta(digest, meta):
+    path = cache_path(f"{digest}.meta.json")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+def fetch_cached(key, output):
+    """Copy a cached output to a path or file object; False on a miss"""
+    path = cache_path(f"{key}.pdf")
+    try:
+        if hasattr(output, "write"):
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, output)
+        else:
+            link_or_copy(path, output)
+        os.utime(path)  # mark as recently used
+        return True
+    except FileNotFoundError:
+        return False
+
+def store_cached(key, output):
+    path = cache_path(f"{key}.pdf")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    if hasattr(output, "write"):
+        output.seek(0)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(output, f)
+    else:
+        link_or_copy(output, tmp_path)
+    os.replace(tmp_path, path)
+    evict_cache()
+
+def evict_cache():
+    """Drop least recently used entries until the cache fits in CACHE_MAX_BYTES"""
+    entries = []
+    for entry in os.scandir(CACHE_FOLDER):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        # A .tmp file is another request's write in flight; only drop it once abandoned
+        if entry.name.endswith(".tmp") and time.time() - stat.st_mtime < WORKSPACE_TTL:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+class SourcePdf:
+    """An input PDF known by its content hash; only parsed when really needed"""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self.digest = content_hash(source)
+        self.meta = read_meta(self.digest)
+        self._reader = None
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            with timed("parse"):
+                self._reader = PdfReader(self.source)
+                pages = len(self._reader.pages)  # force the page tree to parse
+            if self.meta is None:
+                self.meta = {"pages": pages}
+                write_meta(self.digest, self.meta)
+        return self._reader
+
+    @property
+    def pages(self):
+        if self.meta is None:
+            self.reader
+        return self.meta["pages"]
+
+def valid_pdfs(sources):
+    """Wrap each (name, path or stream) as a SourcePdf, skipping files that can't be read"""
+    pdfs = []
+    for name, source in sources:
+        try:
+            pdf = SourcePdf(name, source)
+            pdf.pages
+            pdfs.append(pdf)
+        except Exception as e:
+            print(f"Error reading {name}: {str(e)}")
+    return pdfs
+
+def merge_cached(pdfs, output, progress=None):
+    key = cache_key("merge", [pdf.digest for pdf in pdfs])
+    if not fetch_cached(key, output):
+        merge_pdfs([pdf.reader for pdf in pdfs], output, progress)
+        store_cached(key, output)
+
+def split_cached(pdf, start, end, output, progress=None):
+    key = cache_key("split", [pdf.digest], start, end)
+    if not fetch_cached(key, output):
+        split_pdf(pdf.reader, start, end, output, progress)
+        store_cached(key, output)
+
+@timed("write")
+def write_pdf(writer, output):
+    """Write to a path or straight into an open file object"""
+    if hasattr(output, "write"):
+        writer.write(output)
+    else:
+        with open(output, "wb") as f:
+            writer.write(f)
+
+def merge_pdfs(readers, output, progress=None):
+    writer = PdfWriter()
+    if progress:
+        progress.start(sum(len(reader.pages) for reader in readers))
+    with timed("add_page"):
+        for reader in readers:
+            for page in reader.pages:
+                writer.add_page(page)
+                if progress:
+                    progress.advance()
+    write_pdf(writer, output)
+
+def split_pdf(reader, start, end, output, progress=None):
+    """Write zero-based pages [start, end) of reader to output"""
+    writer = PdfWriter()
+    if progress:
+        progress.start(end - start)
+    with timed("add_page"):
+        for i in range(start, end):
+            writer.add_page(reader.pages[i])
+            if progress:
+                progress.advance()
+    write_pdf(writer, output)
+
+# --- Batch outputs ---
+
+def parse_manifest(raw, pdfs_by_name):
+    """Turn the JSON manifest into [(output name, [(SourcePdf, start, end), ...])]
+
+    The manifest is a list of outputs, each either a single range
+    {"name": "ch1.pdf", "file": "book.pdf", "start": 1, "end": 20}
+    or several ranges joined in order
+    {"name": "mix.pdf", "ranges": [{"file": "a.pdf", "start": 1, "end": 3}, {"file": "b.pdf"}]}.
+    Pages are 1-based and inclusive like the form; a missing start/end means
+    the first/last page, and "file" may be left out when only one PDF is
+    uploaded. Returned ranges are zero-based [start, end).
+    """
+    try:
+        manifest = json.loads(raw)
+    except ValueError:
+        raise ValueError("Manifest must be valid JSON.")
+    if not isinstance(manifest, list) or not manifest:
+        raise ValueError("Manifest must be a non-empty list of outputs.")
+
+    default = next(iter(pdfs_by_name.values())) if len(pdfs_by_name) == 1 else None
+    outputs = []
+    names = set()
+    for number, item in enumerate(manifest, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Output {number} must be an object.")
+        name = item.get("name")
+        if name is not None and not isinstance(name, str):
+            raise ValueError(f"Output {number}: name must be a string.")
+        name = secure_filename(name or f"output_{number}.pdf")
+        if not name.lower().endswith(".pdf"):
+            name += ".pdf"
+        if name in names:
+            raise ValueError(f"Duplicate output name: {name}")
+        names.add(name)
+
+        ranges = item.get("ranges", [item])
+        if not isinstance(ranges, list) or not ranges:
+            raise ValueError(f"{name}: ranges must be a non-empty list.")
+        parts = []
+        for page_range in ranges:
+            if not isinstance(page_range, dict):
+                raise ValueError(f"{name}: each range must be an object.")
+            file = page_range.get("file")
+            if file is not None and not isinstance(file, str):
+                raise ValueError(f"{name}: file must be a file name.")
+            pdf = pdfs_by_name.get(secure_filename(file)) if file else default
+            if pdf is None:
+                raise ValueError(f"{name}: unknown or missing input file {file!r}.")
+            start = page_range.get("start", 1)
+            end = page_range.get("end", pdf.pages)
+            # JSON true/false arrive as bools, which are ints too; 2.9 is not page 2
+            if any(isinstance(page, bool) or not isinstance(page, int) for page in (start, end)):
+                raise ValueError(f"{name}: page numbers must be integers.")
+            if start < 1 or end > pdf.pages or start > end:
+                raise ValueError(f"{name}: invalid page range {start}-{end}. {pdf.name} has {pdf.pages} pages.")
+            parts.append((pdf, start - 1, end))
+        outputs.append((name, parts))
+    return outputs
+
+def build_pages(parts, output):
+    """Write the given page ranges, in order, as one PDF"""
+    key = cache_key("pages", [[pdf.digest, start, end] for pdf, start, end in parts])
+    if fetch_cached(key, output):
+        return
+    writer = PdfWriter()
+    for pdf, start, end in parts:
+        # Each input is parsed once and its page objects reused by every output
+        reader = pdf.reader
+        with timed("add_page"):
+            for i in range(start, end):
+                writer.add_page(reader.pages[i])
+    write_pdf(writer, output)
+    store_cached(key, output)
+
+class ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that hands written bytes back out in chunks"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+def zip_outputs(outputs):
+    """Yield a ZIP of the outputs piece by piece, building one PDF at a time"""
+    sink = ChunkSink()
+    # PDFs are mostly compressed already, so store them as-is
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for name, parts in outputs:
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as pdf:
+                build_pages(parts, pdf)
+                size = pdf.tell()
+                pdf.seek(0)
+                with archive.open(name, "w", force_zip64=size >= zipfile.ZIP64_LIMIT) as entry:
+                    # Hand each piece on as soon as it is written, not the whole member
+                    while chunk := pdf.read(ZIP_CHUNK_SIZE):
+                        entry.write(chunk)
+                        yield from sink.drain()
+            yield from sink.drain()  # the member's data descriptor
+    yield from sink.drain()  # the central directory
+
+# --- Background jobs ---
+# Job state lives in outputs/<job id>.json so any web worker can answer a
+# status request, whichever worker took the upload.
+
+executor = None
+
+def get_executor():
+    global executor
+    if executor is None:
+        # Spawned, not forked: a fork of this threaded server could inherit a
+        # lock (e.g. the metrics registry's) held by another thread and hang
+        executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return executor
+
+def job_finished(job_id, future):
+    """run_job reports its own errors; this catches the job process dying under it"""
+    global executor
+    error = future.exception()
+    if error is None:
+        return
+    if isinstance(error, BrokenProcessPool):
+        executor = None  # the next job starts a fresh pool
+    # Otherwise the job would stay queued/running, and the janitor would keep its files forever
+    write_status(job_id, status="error", message=f"Job process failed: {error}")
+
+def status_path(job_id):
+    return os.path.join(OUTPUT_FOLDER, f"{job_id}.json")
+
+def write_status(job_id, **status):
+    tmp_path = f"{status_path(job_id)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp_path, status_path(job_id))  # readers never see a half-written file
+
+def read_status(job_id):
+    try:
+        with open(status_path(job_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+class JobProgress:
+    """Counts processed pages and writes them to the status file every so often"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.total = None
+        self.done = 0
+        self.last_write = 0.0
+
+    def start(self, total):
+        self.total = total
+
+    def advance(self):
+        self.done += 1
+        now = time.monotonic()
+        if now - self.last_write >= PROGRESS_INTERVAL:
+            self.last_write = now
+            write_status(self.job_id, status="running", pages_done=self.done, pages_total=self.total)
+
+def run_job(job_id, action, workspace, paths, start=None, end=None):
+    """Runs in the process pool and reports through the job's status file"""
+    try:
+        write_status(job_id, status="running", pages_done=0, pages_total=None)
+        pdfs = valid_pdfs((os.path.basename(path), path) for path in paths)
+        progress = JobProgress(job_id)
+        output_file = output_name(job_id, "merged" if action == "merge" else "split")
+        output_path = os.path.join(OUTPUT_FOLDER, output_file)
+
+        if action == "merge":
+            if len(pdfs) < 2:
+                raise ValueError("Need at least 2 valid PDF files to merge.")
+            merge_cached(pdfs, output_path, progress)
+            total = sum(pdf.pages for pdf in pdfs)
+        else:
+            if not pdfs:
+                raise ValueError("Could not read the PDF file.")
+            total_pages = pdfs[0].pages
+            if start < 0 or end > total_pages or start >= end:
+                raise ValueError(f"Invalid page range. PDF has {total_pages} pages.")
+            split_cached(pdfs[0], start, end, output_path, progress)
+            total = end - start
+        write_status(job_id, status="done", pages_done=total, pages_total=total, output_file=output_file)
+    except Exception as e:
+        write_status(job_id, status="error", message=str(e))
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     message = ""
@@ -35,9 +554,7 @@ def index():
     if request.method == "POST":
         action = request.form.get("action")
 
-        # Clear previous files
-        clear_folder(UPLOAD_FOLDER)
-        clear_folder(OUTPUT_FOLDER)
+        job_id = uuid.uuid4().hex
 
         # --- MERGE PDFs ---
         if action == "merge":
@@ -47,38 +564,17 @@ def index():
                 message_type = "error"
             else:
                 try:
-                    writer = PdfWriter()
-                    valid_files = 0
-                    
-                    for file in files:
-                        if file.filename == '':
-                            continue
-                            
-                        filename = secure_filename(file.filename)
-                        if not filename.lower().endswith('.pdf'):
-                            continue
-                            
-                        filepath = os.path.join(UPLOAD_FOLDER, filename)
-                        file.save(filepath)
-
-                        try:
-                            reader = PdfReader(filepath)
-                            for page in reader.pages:
-                                writer.add_page(page)
-                            valid_files += 1
-                        except Exception as e:
-                            print(f"Error reading {filename}: {str(e)}")
-                            continue
+                    # Read straight from the request's upload spool; nothing is saved first
+                    pdfs = valid_pdfs(upload_sources(files))
+                    valid_files = len(pdfs)
 
                     if valid_files < 2:
                         message = "Error: Need at least 2 valid PDF files to merge."
                         message_type = "error"
                     else:
-                        output_path = os.path.join(OUTPUT_FOLDER, "merged.pdf")
-                        with open(output_path, "wb") as f:
-                            writer.write(f)
+                        output_file = output_name(job_id, "merged")
+                        merge_cached(pdfs, os.path.join(OUTPUT_FOLDER, output_file))
 
-                        output_file = "merged.pdf"
                         message = f"Success! {valid_files} PDFs merged successfully!"
                         message_type = "success"
                         
@@ -105,11 +601,8 @@ def index():
                         message = "Error: Only PDF files are allowed."
                         message_type = "error"
                     else:
-                        filepath = os.path.join(UPLOAD_FOLDER, filename)
-                        file.save(filepath)
-
-                        reader = PdfReader(filepath)
-                        total_pages = len(reader.pages)
+                        pdf = SourcePdf(filename, upload_source(file))
+                        total_pages = pdf.pages
                         
                         try:
                             start = int(start_page) - 1  # zero-based index
@@ -119,15 +612,9 @@ def index():
                                 message = f"Error: Invalid page range. PDF has {total_pages} pages."
                                 message_type = "error"
                             else:
-                                writer = PdfWriter()
-                                for i in range(start, end):
-                                    writer.add_page(reader.pages[i])
+                                output_file = output_name(job_id, "split")
+                                split_cached(pdf, start, end, os.path.join(OUTPUT_FOLDER, output_file))
 
-                                output_path = os.path.join(OUTPUT_FOLDER, "split.pdf")
-                                with open(output_path, "wb") as f:
-                                    writer.write(f)
-
-                                output_file = "split.pdf"
                                 message = f"Success! PDF split from page {start+1} to {end}."
                                 message_type = "success"
                                 
@@ -148,16 +635,96 @@ def index():
 
 @app.route("/download/<filename>")
 def download(filename):
-    path = os.path.join(OUTPUT_FOLDER, filename)
-    
     # Security check
+    match = OUTPUT_NAME.match(filename)
+    if not match:
+        return "Invalid file type", 400
+
+    path = os.path.join(OUTPUT_FOLDER, filename)
     if not os.path.exists(path):
         return "File not found", 404
         
-    if not filename.lower().endswith('.pdf'):
-        return "Invalid file type", 400
-        
-    return send_file(path, as_attachment=True)
+    return send_file(path, as_attachment=True, download_name=f"{match.group(1)}.pdf")
+
+@app.route("/merge", methods=["POST"])
+def merge_stream():
+    """Merge the uploads and return the PDF in the response body; nothing is staged in outputs/"""
+    pdfs = valid_pdfs(upload_sources(request.files.getlist("pdf_files")))
+    if len(pdfs) < 2:
+        return "Error: Need at least 2 valid PDF files to merge.", 400
+
+    merged = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    merge_cached(pdfs, merged)
+    merged.seek(0)
+    return send_file(merged, mimetype="application/pdf", as_attachment=True, download_name="merged.pdf")
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    """Cut any number of outputs out of the uploaded PDFs in one pass, returned as a ZIP"""
+    pdfs = valid_pdfs(upload_sources(request.files.getlist("pdf_files"), detach=True))
+    if not pdfs:
+        return jsonify(error="Please upload at least one valid PDF file."), 400
+    try:
+        outputs = parse_manifest(request.form.get("manifest", ""), {pdf.name: pdf for pdf in pdfs})
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    return Response(
+        stream_with_context(zip_outputs(outputs)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment; filename=batch.zip"},
+    )
+
+# --- Job API ---
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    action = request.form.get("action")
+    start = end = None
+
+    if action == "merge":
+        files = request.files.getlist("pdf_files")
+    elif action == "split":
+        files = request.files.getlist("pdf_file")
+        try:
+            start = int(request.form.get("start_page", "")) - 1  # zero-based index
+            end = int(request.form.get("end_page", ""))
+        except ValueError:
+            return jsonify(error="Page numbers must be integers."), 400
+    else:
+        return jsonify(error="Action must be 'merge' or 'split'."), 400
+
+    job_id, workspace = create_workspace()
+    paths = save_uploads(files, workspace)
+    needed = 2 if action == "merge" else 1
+    if len(paths) < needed:
+        shutil.rmtree(workspace, ignore_errors=True)
+        return jsonify(error=f"Please upload at least {needed} PDF file(s)."), 400
+
+    write_status(job_id, status="queued", pages_done=0, pages_total=None)
+    future = get_executor().submit(run_job, job_id, action, workspace, paths, start, end)
+    future.add_done_callback(lambda future: job_finished(job_id, future))
+    return jsonify(
+        job_id=job_id,
+        status_url=url_for("job_status", job_id=job_id),
+        result_url=url_for("job_result", job_id=job_id),
+    ), 202
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    status = read_status(job_id) if JOB_ID.match(job_id) else None
+    if status is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(job_id=job_id, **status)
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    status = read_status(job_id) if JOB_ID.match(job_id) else None
+    if status is None:
+        return jsonify(error="Job not found"), 404
+    if status["status"] != "done":
+        return jsonify(job_id=job_id, **status), 409
+    return download(status["output_file"])
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,388 @@
+"""Load test and profile for the PDF merge/split service.
+
+Generates synthetic PDFs, posts merges and splits to the app at rising
+concurrency and writes a JSON report. The app can be driven two ways:
+
+- "testclient" runs in-process through Flask's test client. Every app
+  helper is wrapped to record how long each request spends in pypdf,
+  disk I/O, hashing and clear_folder.
+- "gunicorn" starts a local gunicorn and sends real HTTP requests to it.
+  This also records each worker's peak RSS (Linux only).
+
+    python benchmark.py --pages 10,200 --concurrency 1,4,8 -o bench.json
+    python benchmark.py --modes testclient,gunicorn --workers 4
+    python benchmark.py --compare old.json bench.json
+
+The output cache is off by default, so every request does the full work.
+Pass --cache to measure repeat requests served from the cache.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, NameObject
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Which bucket each app function's own time is reported under
+STAGES = {
+    "PdfReader": "pypdf_parse",
+    "merge_pdfs": "pypdf_assemble",
+    "split_pdf": "pypdf_assemble",
+    "build_pages": "pypdf_assemble",
+    "write_pdf": "pypdf_write",
+    "content_hash": "hashing",
+    "save_uploads": "disk_io",
+    "fetch_cached": "disk_io",
+    "store_cached": "disk_io",
+    "evict_cache": "disk_io",
+    "read_meta": "disk_io",
+    "write_meta": "disk_io",
+    "clear_folder": "clear_folder",
+}
+
+# --- synthetic input ---
+
+def make_pdf(pages, page_kb=1):
+    """A PDF with `pages` pages, each carrying about `page_kb` KB of content."""
+    writer = PdfWriter()
+    filler = b"% " + b"x" * 78 + b"\n"
+    body = filler * max(page_kb * 1024 // len(filler), 1)
+    for number in range(pages):
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        content.set_data(b"BT /F1 12 Tf 72 720 Td (Page %d) Tj ET\n" % number + body)
+        page[NameObject("/Contents")] = writer._add_object(content)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+def scenarios(page_counts, page_kb):
+    for pages in page_counts:
+        for kb in page_kb:
+            doc = make_pdf(pages, kb)
+            yield {
+                "action": "merge",
+                "pages": pages,
+                "page_kb": kb,
+                "form": {"action": "merge"},
+                "files": [("pdf_files", "a.pdf", doc), ("pdf_files", "b.pdf", doc)],
+            }
+            yield {
+                "action": "split",
+                "pages": pages,
+                "page_kb": kb,
+                "form": {"action": "split", "start_page": "1", "end_page": str(max(pages // 2, 1))},
+                "files": [("pdf_file", "a.pdf", doc)],
+            }
+
+def unique_files(files):
+    """Vary one byte per request so the content-addressed cache can't answer it."""
+    marker = uuid.uuid4().hex.encode()
+    return [(field, name, data + b"\n%" + marker + b"\n") for field, name, data in files]
+
+# --- stage timing ---
+
+class StageTimer:
+    """Records each wrapped function's own time (time in wrapped callees is not counted twice)."""
+
+    def __init__(self):
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            stack = self.local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with self.lock:
+                    self.totals[name] = self.totals.get(name, 0.0) + elapsed - children
+        return timed
+
+    def instrument(self, module):
+        for name in STAGES:
+            setattr(module, name, self.wrap(name, getattr(module, name)))
+
+    def report(self, requests):
+        by_stage = {}
+        for name, seconds in self.totals.items():
+            by_stage[STAGES[name]] = by_stage.get(STAGES[name], 0.0) + seconds
+        return {
+            "total_s": {stage: round(seconds, 4) for stage, seconds in sorted(by_stage.items())},
+            "per_request_ms": {stage: round(seconds / requests * 1000, 3)
+                               for stage, seconds in sorted(by_stage.items())},
+            "functions_s": {name: round(seconds, 4) for name, seconds in sorted(self.totals.items())},
+        }
+
+# --- load generation ---
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(int(round(pct / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+def run_load(send, scenario, concurrency, requests, fresh_inputs):
+    """Call send(form, files) `requests` times from `concurrency` threads."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        files = unique_files(scenario["files"]) if fresh_inputs else scenario["files"]
+        start = time.perf_counter()
+        ok = send(scenario["form"], files)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += 0 if ok else 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "requests_per_sec": round(requests / wall, 2),
+        "latency_ms": {f"p{pct}": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 90, 99)},
+    }
+
+SUCCESS = re.compile(rb"Success!")
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def bench_testclient(scenario_list, levels, requests, cache, workdir):
+    """In-process runs; returns one result per scenario and concurrency level."""
+    os.chdir(workdir)  # the app creates uploads/ outputs/ cache/ relative to cwd
+    sys.path.insert(0, APP_DIR)
+    import app as pdf_app
+    if not cache:
+        pdf_app.CACHE_MAX_BYTES = 0  # every store is evicted straight away
+
+    results = []
+    for scenario in scenario_list:
+        for level in levels:
+            timer = StageTimer()
+            originals = {name: getattr(pdf_app, name) for name in STAGES}
+            timer.instrument(pdf_app)
+
+            def send(form, files):
+                client = pdf_app.app.test_client()
+                data = dict(form)
+                for field, name, payload in files:
+                    data.setdefault(field, []).append((io.BytesIO(payload), name))
+                response = client.post("/", data=data, content_type="multipart/form-data")
+                return response.status_code == 200 and bool(SUCCESS.search(response.data))
+
+            run = run_load(send, scenario, level, requests, fresh_inputs=not cache)
+            for name, fn in originals.items():
+                setattr(pdf_app, name, fn)
+
+            # The request path no longer sweeps folders; time one janitor pass instead
+            sweep_start = time.perf_counter()
+            pdf_app.clear_folder(pdf_app.OUTPUT_FOLDER)
+            run["janitor_sweep_ms"] = round((time.perf_counter() - sweep_start) * 1000, 3)
+
+            run.update(mode="testclient", action=scenario["action"], pages=scenario["pages"],
+                       page_kb=scenario["page_kb"], concurrency=level,
+                       stages=timer.report(requests), peak_rss_kb=peak_rss_kb())
+            print_run(run)
+            results.append(run)
+    return results
+
+def encode_multipart(form, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in form.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for field, name, payload in files:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{name}"\r\n'
+                   f'Content-Type: application/pdf\r\n\r\n'.encode())
+        body.write(payload)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def worker_peak_rss_kb(master_pid):
+    """Peak RSS (VmHWM) of each gunicorn worker, read from /proc."""
+    peaks = {}
+    if not os.path.isdir("/proc"):
+        return None
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            if ppid != master_pid:
+                continue
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peaks[pid] = int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return peaks
+
+def bench_gunicorn(scenario_list, levels, requests, cache, workdir, workers):
+    if shutil.which("gunicorn") is None:
+        print("gunicorn not found; skipping gunicorn runs")
+        return []
+
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=APP_DIR)
+    server = subprocess.Popen(
+        ["gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "300", "app:app"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(url, timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            print("gunicorn did not start; skipping gunicorn runs")
+            return []
+
+        def send(form, files):
+            body, content_type = encode_multipart(form, files)
+            req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+            try:
+                with urllib.request.urlopen(req, timeout=300) as response:
+                    return response.status == 200 and bool(SUCCESS.search(response.read()))
+            except OSError:
+                return False
+
+        results = []
+        for scenario in scenario_list:
+            for level in levels:
+                # Each run gets different bytes, so caching can't skew later runs
+                run = run_load(send, scenario, level, requests, fresh_inputs=not cache)
+                run.update(mode="gunicorn", action=scenario["action"], pages=scenario["pages"],
+                           page_kb=scenario["page_kb"], concurrency=level, workers=workers,
+                           worker_peak_rss_kb=worker_peak_rss_kb(server.pid))
+                print_run(run)
+                results.append(run)
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+def print_run(run):
+    print(f"{run['mode']:>10} {run['action']:>5} {run['pages']:>5}p x {run['page_kb']}KB "
+          f"@ {run['concurrency']:<3} {run['requests_per_sec']:>8} req/s  "
+          f"p50 {run['latency_ms']['p50']} ms  p99 {run['latency_ms']['p99']} ms  errors {run['errors']}")
+
+def compare(old_path, new_path):
+    """Print throughput and latency changes between two reports."""
+    def key(run):
+        return run["mode"], run["action"], run["pages"], run["page_kb"], run["concurrency"]
+
+    with open(old_path) as f:
+        old = {key(run): run for run in json.load(f)["runs"]}
+    with open(new_path) as f:
+        new = json.load(f)["runs"]
+    for run in new:
+        before = old.get(key(run))
+        if not before:
+            continue
+        change = (run["requests_per_sec"] / before["requests_per_sec"] - 1) * 100
+        print(f"{run['mode']:>10} {run['action']:>5} {run['pages']:>5}p x {run['page_kb']}KB @ {run['concurrency']:<3} "
+              f"{before['requests_per_sec']:>8} -> {run['requests_per_sec']:>8} req/s ({change:+.1f}%), "
+              f"p99 {before['latency_ms']['p99']} -> {run['latency_ms']['p99']} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test and profile the PDF merge/split service")
+    parser.add_argument("--modes", default="testclient", help="comma-separated: testclient, gunicorn")
+    parser.add_argument("--pages", default="10,200", help="comma-separated page counts per input PDF")
+    parser.add_argument("--page-kb", default="1", help="comma-separated content size per page in KB")
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario and level")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--cache", action="store_true", help="let the output cache answer repeat requests")
+    parser.add_argument("-o", "--out", default="bench.json", help="where to write the JSON report")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    out_path = os.path.abspath(args.out)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    scenario_list = list(scenarios([int(p) for p in args.pages.split(",")],
+                                   [int(k) for k in args.page_kb.split(",")]))
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    runs = []
+    try:
+        if "gunicorn" in modes:
+            runs += bench_gunicorn(scenario_list, levels, args.requests, args.cache, workdir, args.workers)
+        if "testclient" in modes:
+            runs += bench_testclient(scenario_list, levels, args.requests, args.cache, workdir)
+    finally:
+        os.chdir(APP_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "cache": args.cache,
+        },
+        "runs": runs,
+    }
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Report written to {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Request and stage timing for a Flask app, exposed in Prometheus text format.
+
+    from instrumentation import instrument, timed
+
+    instrument(app)             # per-route latency, bytes in/out, GET /metrics
+
+    @timed("parse")             # or: with timed("parse"): ...
+    def parse(...): ...
+
+Stage timings are labelled with the route of the request they ran in (empty
+outside a request, e.g. in a background thread). Metrics live in the process
+that recorded them, so each gunicorn worker serves its own /metrics.
+
+Set METRICS_PROFILE=1 (or instrument(app, profile=True)) to also run a
+sampling profiler. GET /metrics/profile returns its collapsed stacks, which
+flamegraph.pl and speedscope read; ?reset=1 starts a fresh sample.
+
+Day65 carries a cut-down copy (no streamed bodies, no profiler), since each
+day's app is deployed on its own; fixes to the shared parts go in both.
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+# Latency histogram upper bounds in seconds (+Inf is implied)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_INTERVAL = 0.01
+# Deepest stack kept per profiler sample
+PROFILE_DEPTH = 64
+
+HELP = {
+    "http_request_duration_seconds": "Time from request start until the response body was sent",
+    "http_request_bytes_total": "Request body bytes received",
+    "http_response_bytes_total": "Response body bytes sent",
+    "stage_duration_seconds": "Time spent in an instrumented stage",
+}
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class Registry:
+    """Histograms and counters keyed by (metric name, sorted label pairs)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = Counter()
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def render(self):
+        """Everything recorded so far in Prometheus text exposition format."""
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                header(name, "histogram")
+                cumulative = 0
+                bounds = [repr(float(bound)) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+REGISTRY = Registry()
+
+def current_route():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return ""
+
+@contextmanager
+def timed(stage):
+    """Record how long the block (or decorated function) takes as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe("stage_duration_seconds", {"route": current_route(), "stage": stage},
+                         time.perf_counter() - start)
+
+def count_bytes(body, on_done):
+    """Pass a streamed body through, then report how many bytes it had."""
+    sent = 0
+    try:
+        for chunk in body:
+            sent += len(chunk)
+            yield chunk
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+        on_done(sent)
+
+class SamplingProfiler:
+    """Samples every thread's stack each `interval` seconds into collapsed-stack counts."""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stacks = Counter()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            samples = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < PROFILE_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                samples.append(";".join(reversed(stack)))
+            with self.lock:
+                self.stacks.update(samples)
+
+    def collapsed(self, reset=False):
+        with self.lock:
+            text = "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+            if reset:
+                self.stacks.clear()
+        return text
+
+def instrument(app, profile=None):
+    """Time every request by route and serve the results at /metrics."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record(response):
+        start = g.pop("metrics_start", None)
+        route = current_route() or "unmatched"
+        labels = {"method": request.method, "route": route, "status": str(response.status_code)}
+        REGISTRY.inc("http_request_bytes_total", {"route": route}, request.content_length or 0)
+
+        def done(sent):
+            REGISTRY.inc("http_response_bytes_total", {"route": route}, sent)
+            if start is not None:
+                REGISTRY.observe("http_request_duration_seconds", labels, time.perf_counter() - start)
+
+        length = response.content_length
+        if length is None and response.is_streamed:
+            # Size and duration are only known once the body has been sent
+            response.response = count_bytes(response.response, done)
+        else:
+            done(length or 0)
+        return response
+
+    def metrics():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics)
+
+    if profile is None:
+        profile = os.environ.get("METRICS_PROFILE") == "1"
+    if profile:
+        profiler = SamplingProfiler().start()
+
+        def profile_view():
+            return Response(profiler.collapsed(reset=request.args.get("reset") == "1"), mimetype="text/plain")
+
+        app.add_url_rule("/metrics/profile", "metrics_profile", profile_view)
+    return app
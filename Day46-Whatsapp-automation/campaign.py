@@ -0,0 +1,357 @@
+"""Bulk WhatsApp campaigns: a CSV of recipients goes into a durable queue
+that one dispatcher drains in send-time order.
+
+    python campaign.py load recipients.csv --template "Hi {name}, your order {order} is ready"
+    python campaign.py run --rate 4 --sender stub
+    python campaign.py status
+
+The CSV needs a `phone` column (with country code, e.g. +91XXXXXXXXXX).
+Each row's message is `message` (or --template) formatted with that row's
+columns. `send_at` ("YYYY-MM-DD HH:MM" or "HH:MM") is optional; empty means
+as soon as possible.
+"""
+import argparse
+import csv
+import hashlib
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = "campaign.db"
+# Messages per minute; WhatsApp Web gets unhappy when driven much faster
+RATE_PER_MINUTE = 4
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 60  # seconds before the first retry; doubles after each failure
+# How long pywhatkit waits for WhatsApp Web to load before typing
+PYWHATKIT_WAIT = 15
+
+STATUSES = ("pending", "sending", "sent", "failed")
+
+# --- senders ---
+# A sender is any object with send(phone, message) that raises on failure.
+
+class PyWhatKitSender:
+    """Sends through WhatsApp Web in the default browser."""
+
+    def __init__(self, wait_time=PYWHATKIT_WAIT):
+        # Imported here: pywhatkit checks for internet access on import
+        import pywhatkit
+        self.kit = pywhatkit
+        self.wait_time = wait_time
+
+    def send(self, phone, message):
+        # The dispatcher already waited for send_at, so send right away
+        self.kit.sendwhatmsg_instantly(phone, message, self.wait_time, tab_close=True)
+
+class StubSender:
+    """Pretends to send. For trying out campaigns and measuring the dispatcher."""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.sent = []
+
+    def send(self, phone, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("stub failure")
+        self.sent.append((phone, message))
+
+SENDERS = {
+    "pywhatkit": PyWhatKitSender,
+    "stub": StubSender,
+}
+
+# --- queue ---
+
+def dedup_key(phone, message, schedule):
+    """Same recipient, text and schedule means the same job, however often it is loaded.
+
+    schedule names the send day and the send time as the user wrote it
+    (see read_recipients), not the resolved timestamp: an empty send_at
+    resolves to the load time, so a CSV loaded again a minute later would
+    otherwise be queued a second time. The day keeps a recurring campaign
+    loaded again tomorrow from being mistaken for today's.
+    """
+    return hashlib.sha1(f"{phone}\0{message}\0{schedule}".encode()).hexdigest()
+
+def schedule_text(send_at):
+    return datetime.fromtimestamp(send_at).strftime("%Y-%m-%d %H:%M")
+
+class CampaignQueue:
+    """Jobs in SQLite, ordered by send time.
+
+    The (status, send_at) index keeps the earliest due job at the front,
+    which makes it a heap that survives restarts. Each connection belongs
+    to one thread, so open one queue per thread.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY,"
+            " phone TEXT NOT NULL,"
+            " message TEXT NOT NULL,"
+            " send_at REAL NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " dedup_key TEXT UNIQUE,"
+            " updated REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, send_at)")
+        self.db.commit()
+
+    def add(self, phone, message, send_at, schedule=None):
+        """Queue one message; returns its job id, or None if it was already queued.
+
+        schedule defaults to send_at's minute; see dedup_key.
+        """
+        if schedule is None:
+            schedule = schedule_text(send_at)
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO jobs (phone, message, send_at, dedup_key, updated) VALUES (?, ?, ?, ?, ?)",
+            (phone, message, send_at, dedup_key(phone, message, schedule), time.time()),
+        )
+        self.db.commit()
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def add_many(self, jobs):
+        """Queue (phone, message, send_at, schedule) tuples in one transaction; returns how many were new."""
+        before = self.db.total_changes
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (phone, message, send_at, dedup_key, updated) VALUES (?, ?, ?, ?, ?)",
+                [(phone, message, send_at, dedup_key(phone, message, schedule), time.time())
+                 for phone, message, send_at, schedule in jobs],
+            )
+        return self.db.total_changes - before
+
+    def next_due(self):
+        """Send time of the earliest pending job, or None when nothing is pending."""
+        row = self.db.execute(
+            "SELECT send_at FROM jobs WHERE status = 'pending' ORDER BY send_at LIMIT 1"
+        ).fetchone()
+        return row["send_at"] if row else None
+
+    def claim(self, now=None):
+        """Mark the earliest due job as sending and return it, or None."""
+        now = time.time() if now is None else now
+        while True:
+            with self.db:
+                row = self.db.execute(
+                    "SELECT * FROM jobs WHERE status = 'pending' AND send_at <= ? ORDER BY send_at, id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                # Only one process can move the job out of pending; if another
+                # got there between the SELECT and here, try the next one
+                claimed = self.db.execute(
+                    "UPDATE jobs SET status = 'sending', attempts = attempts + 1, updated = ?"
+                    " WHERE id = ? AND status = 'pending'",
+                    (time.time(), row["id"]),
+                ).rowcount
+            if claimed:
+                return dict(row, status="sending", attempts=row["attempts"] + 1)
+
+    def mark_sent(self, job_id):
+        with self.db:
+            self.db.execute("UPDATE jobs SET status = 'sent', last_error = NULL, updated = ? WHERE id = ?",
+                            (time.time(), job_id))
+
+    def mark_failed(self, job, error, retry_at=None):
+        """Put the job back for another try at retry_at, or fail it for good."""
+        status = "pending" if retry_at is not None else "failed"
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, send_at = COALESCE(?, send_at), last_error = ?, updated = ? WHERE id = ?",
+                (status, retry_at, str(error), time.time(), job["id"]),
+            )
+        return status
+
+    def recover(self):
+        """Return jobs left 'sending' by a crashed dispatcher to the queue.
+
+        Whether such a message went out is unknown, so it may be sent twice;
+        that beats never sending it.
+        """
+        with self.db:
+            return self.db.execute(
+                "UPDATE jobs SET status = 'pending', updated = ? WHERE status = 'sending'", (time.time(),)
+            ).rowcount
+
+    def counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        for row in self.db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def close(self):
+        self.db.close()
+
+# --- dispatcher ---
+
+class Dispatcher:
+    """Drains a CampaignQueue through a sender, one message at a time.
+
+    Sends are spaced to `rate` per minute. A failed send is retried after
+    RETRY_DELAY, doubling each time, until MAX_ATTEMPTS. on_status, if
+    given, is called as on_status(job, status, error) on every change.
+    """
+
+    def __init__(self, queue, sender, rate=RATE_PER_MINUTE, max_attempts=MAX_ATTEMPTS,
+                 retry_delay=RETRY_DELAY, on_status=None):
+        self.queue = queue
+        self.sender = sender
+        self.interval = 60.0 / rate if rate else 0.0
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.on_status = on_status
+        self.next_slot = 0.0
+
+    def _notify(self, job, status, error=None):
+        if self.on_status is not None:
+            self.on_status(job, status, error)
+
+    def dispatch_one(self):
+        """Send the earliest due job if there is one; returns it (or None)."""
+        job = self.queue.claim()
+        if job is None:
+            return None
+        self._notify(job, "sending")
+        try:
+            self.sender.send(job["phone"], job["message"])
+        except Exception as e:
+            retry_at = None
+            if job["attempts"] < self.max_attempts:
+                retry_at = time.time() + self.retry_delay * 2 ** (job["attempts"] - 1)
+            status = self.queue.mark_failed(job, e, retry_at)
+            self._notify(job, status, e)
+        else:
+            self.queue.mark_sent(job["id"])
+            self._notify(job, "sent")
+        return job
+
+    def wait_time(self, now):
+        """Seconds until the next send is both due and allowed by the rate limit; None if idle."""
+        due = self.queue.next_due()
+        if due is None:
+            return None
+        return max(due, self.next_slot) - now
+
+    def run(self, stop=None, until_empty=False, poll=1.0, sleep=time.sleep):
+        """Dispatch until stop() is true, or until nothing is pending if until_empty.
+
+        sleep(seconds) is called whenever there is nothing to send yet; an
+        owner thread can pass one that queues new jobs while it waits.
+        """
+        self.queue.recover()
+        while stop is None or not stop():
+            now = time.time()
+            wait = self.wait_time(now)
+            if wait is None:
+                if until_empty:
+                    return
+                sleep(poll)
+                continue
+            if wait > 0:
+                # Wake up at least every `poll` seconds so new jobs and stop() are noticed
+                sleep(min(wait, poll))
+                continue
+            if self.dispatch_one() is not None:
+                self.next_slot = time.time() + self.interval
+
+# --- loading ---
+
+def parse_send_at(text, now=None):
+    """Epoch seconds for "YYYY-MM-DD HH:MM", or the next "HH:MM"; empty means now."""
+    now = datetime.now() if now is None else now
+    text = (text or "").strip()
+    if not text:
+        return now.timestamp()
+    try:
+        return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+    except ValueError:
+        pass
+    clock = datetime.strptime(text, "%H:%M")
+    when = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+    if when < now:
+        when += timedelta(days=1)
+    return when.timestamp()
+
+def read_recipients(path, template=None):
+    """(phone, message, send_at, schedule) for every CSV row; raises ValueError naming the bad row."""
+    jobs = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            phone = (row.get("phone") or "").strip()
+            if not phone.startswith("+"):
+                raise ValueError(f"row {line}: phone must include the country code, e.g. +91XXXXXXXXXX")
+            text = template or row.get("message")
+            if not text:
+                raise ValueError(f"row {line}: no message column and no --template")
+            raw_send_at = (row.get("send_at") or "").strip()
+            try:
+                message = text.format_map(row)
+                send_at = parse_send_at(raw_send_at)
+            except KeyError as e:
+                raise ValueError(f"row {line}: template uses {e}, which is not a column")
+            except ValueError as e:
+                raise ValueError(f"row {line}: {e}")
+            schedule = f"{datetime.fromtimestamp(send_at):%Y-%m-%d} {raw_send_at}"
+            jobs.append((phone, message, send_at, schedule))
+    return jobs
+
+def print_status(queue):
+    counts = queue.counts()
+    print("  ".join(f"{status}: {counts[status]}" for status in STATUSES))
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule and send bulk WhatsApp campaigns")
+    parser.add_argument("--db", default=DB_PATH, help="queue database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="queue every row of a recipients CSV")
+    load.add_argument("csv", help="CSV with phone, and optionally message, send_at and template fields")
+    load.add_argument("--template", help="message template, e.g. 'Hi {name}'; overrides the message column")
+
+    run = commands.add_parser("run", help="send queued messages as they come due")
+    run.add_argument("--sender", choices=SENDERS, default="pywhatkit")
+    run.add_argument("--rate", type=float, default=RATE_PER_MINUTE, help="messages per minute (0 = unlimited)")
+    run.add_argument("--until-empty", action="store_true", help="exit once nothing is pending")
+
+    commands.add_parser("status", help="count jobs by status")
+    args = parser.parse_args()
+
+    queue = CampaignQueue(args.db)
+    try:
+        if args.command == "load":
+            try:
+                jobs = read_recipients(args.csv, args.template)
+            except (OSError, ValueError) as e:
+                sys.exit(f"Error: {e}")
+            added = queue.add_many(jobs)
+            print(f"Queued {added} messages ({len(jobs) - added} duplicates skipped)")
+        elif args.command == "run":
+            def report(job, status, error):
+                print(f"{job['phone']}: {status}" + (f" ({error})" if error else ""))
+
+            dispatcher = Dispatcher(queue, SENDERS[args.sender](), rate=args.rate, on_status=report)
+            try:
+                dispatcher.run(until_empty=args.until_empty)
+            except KeyboardInterrupt:
+                pass
+        print_status(queue)
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
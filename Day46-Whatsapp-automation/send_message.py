@@ -1,7 +1,59 @@
-import pywhatkit as kit
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import PhotoImage
+from campaign import CampaignQueue, Dispatcher, PyWhatKitSender, parse_send_at
+
+# The window's own queue. campaign.py's queue (campaign.db) has its own
+# dispatcher; sharing it would send that campaign from here too and
+# recover() would requeue whatever the CLI is in the middle of sending.
+DB_PATH = "gui_messages.db"
+# How often the GUI checks for status updates from the worker (ms)
+POLL_MS = 200
+
+# The GUI never sends anything itself. New messages go to the worker through
+# `requests`; the worker reports (job id, phone, when, status, error) back
+# through `events`, which the Tk loop drains with root.after.
+requests = queue.Queue()
+events = queue.Queue()
+stop = threading.Event()
+
+def dispatch_worker():
+    """Background thread: owns the message queue and does the actual sending."""
+    def report(job, status, error=None):
+        events.put((job["id"], job["phone"], job["send_at"], status, error))
+
+    def take_requests(seconds):
+        # Sleep by waiting on the inbox, so new messages are queued immediately
+        try:
+            request = requests.get(timeout=seconds)
+        except queue.Empty:
+            return
+        while True:
+            phone, msg, send_at = request
+            job_id = jobs.add(phone, msg, send_at)
+            if job_id is None:
+                events.put((None, phone, send_at, "failed", "already queued for that minute"))
+            else:
+                report({"id": job_id, "phone": phone, "send_at": send_at}, "pending")
+            try:
+                request = requests.get_nowait()
+            except queue.Empty:
+                return
+
+    jobs = CampaignQueue(DB_PATH)
+    try:
+        sender = PyWhatKitSender()
+    except Exception as e:
+        events.put((None, "", None, "failed", f"Can't start PyWhatKit: {e}"))
+        return
+    dispatcher = Dispatcher(jobs, sender, on_status=report)
+    try:
+        dispatcher.run(stop=stop.is_set, poll=0.5, sleep=take_requests)
+    finally:
+        jobs.close()
 
 # Function to send message
 def send_message():
@@ -14,18 +66,52 @@ def send_message():
         messagebox.showwarning("Input Error", "All fields are required!")
         return
 
+    if not phone.startswith("+"):
+        messagebox.showwarning("Input Error", "Include the country code, e.g. +91XXXXXXXXXX")
+        return
+
     try:
         hour = int(hour)
         minute = int(minute)
-        kit.sendwhatmsg(phone, msg, hour, minute)
-        messagebox.showinfo("Success", f"Message scheduled to {phone} at {hour}:{minute}")
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+        # Today at hour:minute, or tomorrow if that has passed
+        send_at = parse_send_at(f"{hour:02d}:{minute:02d}")
+    except ValueError:
+        messagebox.showerror("Error", "Hour must be 0-23 and minute 0-59.")
+        return
+
+    requests.put((phone, msg, send_at))
+    msg_entry.delete("1.0", tk.END)
+
+# Show the worker's status updates; one line per message
+status_rows = {}
+
+def poll_events():
+    while True:
+        try:
+            job_id, phone, send_at, status, error = events.get_nowait()
+        except queue.Empty:
+            break
+        when = time.strftime("%H:%M", time.localtime(send_at)) if send_at else "--:--"
+        line = f"{when}  {phone}  {status}" + (f" ({error})" if error else "")
+        if job_id in status_rows:
+            status_list.delete(status_rows[job_id])
+            status_list.insert(status_rows[job_id], line)
+        else:
+            status_list.insert(tk.END, line)
+            if job_id is not None:
+                status_rows[job_id] = status_list.size() - 1
+        if status == "failed" and job_id is None:
+            messagebox.showerror("Error", error)
+    root.after(POLL_MS, poll_events)
+
+def on_close():
+    stop.set()
+    root.destroy()
 
 # GUI window
 root = tk.Tk()
 root.title("WhatsApp Message Automation")
-root.geometry("500x500")
+root.geometry("500x680")
 root.config(bg="#2C3E50")
 
 # Title
@@ -62,8 +148,17 @@ minute_entry.grid(row=0, column=3, padx=5)
 send_button = tk.Button(root, text="Send Message", font=("Helvetica", 14, "bold"), bg="#27AE60", fg="#ECF0F1", padx=10, pady=5, command=send_message)
 send_button.pack(pady=20)
 
+# Queued messages and their status (pending, sending, sent, failed)
+status_label = tk.Label(root, text="Messages:", font=("Helvetica", 12), bg="#2C3E50", fg="#ECF0F1")
+status_label.pack(pady=5)
+status_list = tk.Listbox(root, font=("Helvetica", 10), width=55, height=7)
+status_list.pack(pady=5)
+
 # Footer
 footer = tk.Label(root, text="Powered by Python & PyWhatKit", font=("Helvetica", 10), bg="#2C3E50", fg="#BDC3C7")
 footer.pack(side=tk.BOTTOM, pady=10)
 
+threading.Thread(target=dispatch_worker, daemon=True).start()
+root.after(POLL_MS, poll_events)
+root.protocol("WM_DELETE_WINDOW", on_close)
 root.mainloop()
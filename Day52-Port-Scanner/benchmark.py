@@ -0,0 +1,293 @@
+"""Throughput benchmark for the scan engines in scanner.py.
+
+Brings up a fake target farm on 127.0.0.0/8 and scans it with every
+engine at several concurrency settings. Each run happens in a fresh
+process so CPU time and peak RSS belong to that run alone.
+
+    python benchmark.py --hosts 4 --ports 20000-20999 --open 50 --filtered 20 -o bench.json
+    python benchmark.py --compare old.json bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import selectors
+import socket
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scanner
+
+FARM_NETWORK = "127.77.0.0"
+DEFAULT_CONCURRENCY = [100, 500, 2000]
+
+class ListenerFarm:
+    """Fake targets on loopback with a fixed mix of open, closed and filtered ports.
+
+    Open ports accept and immediately close. Closed ports have nothing
+    bound, so the kernel answers with RST. Filtered ports get a listener
+    whose accept backlog is already full, so the kernel drops new SYNs
+    and the probe times out. That is the blackhole a firewall would give.
+    """
+
+    def __init__(self, hosts, ports, n_open, n_filtered, seed=0):
+        rng = random.Random(seed)
+        base = int.from_bytes(socket.inet_aton(FARM_NETWORK), "big")
+        self.hosts = [socket.inet_ntoa((base + i + 1).to_bytes(4, "big")) for i in range(hosts)]
+        self.ports = list(ports)
+        self.open = {}
+        self.filtered = {}
+        for host in self.hosts:
+            picked = rng.sample(self.ports, n_open + n_filtered)
+            self.open[host] = sorted(picked[:n_open])
+            self.filtered[host] = sorted(picked[n_open:])
+        self._sockets = []
+        self._selector = selectors.DefaultSelector()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _listen(self, host, port, backlog):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+        self._sockets.append(sock)
+        return sock
+
+    def start(self):
+        for host in self.hosts:
+            for port in self.open[host]:
+                sock = self._listen(host, port, 1024)
+                sock.setblocking(False)
+                self._selector.register(sock, selectors.EVENT_READ)
+            for port in self.filtered[host]:
+                self._listen(host, port, 0)
+                # Fill the accept queue so later SYNs are dropped
+                for _ in range(4):
+                    filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    filler.setblocking(False)
+                    filler.connect_ex((host, port))
+                    self._sockets.append(filler)
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.1):
+                try:
+                    conn, _ = key.fileobj.accept()
+                    conn.close()
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+    def describe(self):
+        return {
+            "hosts": self.hosts,
+            "ports": f"{self.ports[0]}-{self.ports[-1]}",
+            "open_per_host": len(self.open[self.hosts[0]]),
+            "filtered_per_host": len(self.filtered[self.hosts[0]]),
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# --- engines ---
+# Each engine takes (hosts, ports, concurrency) and returns {host: open ports}.
+# Per-probe latency is collected by wrapping the probe function they call.
+
+def run_threaded(hosts, ports, concurrency):
+    scanner.NUM_THREADS = concurrency
+    return {host: scanner.run_scanner(host, (ports[0], ports[-1])) for host in hosts}
+
+def run_asyncio(hosts, ports, concurrency):
+    return scanner.run_async(scanner.async_sweep(hosts, ports, concurrency))
+
+ENGINES = {
+    "threaded": run_threaded,
+    "asyncio": run_asyncio,
+}
+
+def _time_threaded_probes(latencies):
+    port_scan = scanner.port_scan
+
+    def timed(*args):
+        start = time.perf_counter()
+        port_scan(*args)
+        latencies.append(time.perf_counter() - start)
+
+    scanner.port_scan = timed
+
+def _time_async_probes(latencies):
+    async_probe = scanner.async_probe
+
+    async def timed(*args):
+        start = time.perf_counter()
+        try:
+            return await async_probe(*args)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    scanner.async_probe = timed
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(int(round(pct / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def cpu_seconds():
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _child(engine, hosts, ports, concurrency, conn):
+    """Runs one benchmark in a fresh process and sends the stats back."""
+    sys.stdout = open(os.devnull, "w")
+    latencies = []
+    _time_threaded_probes(latencies)
+    _time_async_probes(latencies)
+
+    cpu_start = cpu_seconds()
+    start = time.perf_counter()
+    results = ENGINES[engine](hosts, ports, concurrency)
+    wall = time.perf_counter() - start
+    cpu = cpu_seconds() - cpu_start
+
+    latencies.sort()
+    conn.send({
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "probes": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        },
+        "peak_rss_kb": peak_rss_kb(),
+        "results": {host: sorted(found) for host, found in results.items()},
+    })
+    conn.close()
+
+def run_one(farm, engine, concurrency):
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(engine, farm.hosts, farm.ports, concurrency, child))
+    proc.start()
+    child.close()
+    stats = parent.recv()
+    proc.join()
+
+    results = stats.pop("results")
+    missed = sum(len(set(farm.open[h]) - set(results.get(h, []))) for h in farm.hosts)
+    unexpected = sum(len(set(results.get(h, [])) - set(farm.open[h])) for h in farm.hosts)
+    return {
+        "engine": engine,
+        "concurrency": concurrency,
+        "probes": stats["probes"],
+        "wall_s": round(stats["wall_s"], 4),
+        "probes_per_sec": round(stats["probes"] / stats["wall_s"], 1) if stats["wall_s"] else None,
+        "latency_ms": stats["latency_ms"],
+        "cpu_s": round(stats["cpu_s"], 4),
+        "peak_rss_kb": stats["peak_rss_kb"],
+        "missed_open": missed,
+        "unexpected_open": unexpected,
+    }
+
+def run_benchmark(hosts, ports, n_open, n_filtered, engines, concurrency, seed=0):
+    with ListenerFarm(hosts, ports, n_open, n_filtered, seed) as farm:
+        runs = []
+        for engine in engines:
+            for level in concurrency:
+                print(f"{engine:>10} @ {level:<6}", end=" ", flush=True)
+                run = run_one(farm, engine, level)
+                print(f"{run['probes_per_sec']} probes/s, p99 {run['latency_ms']['p99']} ms")
+                runs.append(run)
+        return {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "seed": seed,
+            },
+            "farm": farm.describe(),
+            "runs": runs,
+        }
+
+def compare(old_path, new_path):
+    """Print throughput and latency changes between two reports."""
+    with open(old_path) as f:
+        old = {(r["engine"], r["concurrency"]): r for r in json.load(f)["runs"]}
+    with open(new_path) as f:
+        new = json.load(f)["runs"]
+    for run in new:
+        before = old.get((run["engine"], run["concurrency"]))
+        if not before or not before["probes_per_sec"]:
+            continue
+        change = (run["probes_per_sec"] / before["probes_per_sec"] - 1) * 100
+        print(f"{run['engine']:>10} @ {run['concurrency']:<6} "
+              f"{before['probes_per_sec']:>10} -> {run['probes_per_sec']:>10} probes/s ({change:+.1f}%), "
+              f"p99 {before['latency_ms']['p99']} -> {run['latency_ms']['p99']} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the port scan engines against a local listener farm")
+    parser.add_argument("--hosts", type=int, default=2, help="number of fake hosts on 127.77.0.0/16")
+    parser.add_argument("--ports", default="20000-20999", help="port range scanned on every host")
+    parser.add_argument("--open", type=int, default=50, help="open ports per host")
+    parser.add_argument("--filtered", type=int, default=20, help="blackholed ports per host")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated engines to run")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--seed", type=int, default=0, help="seed for picking open/filtered ports")
+    parser.add_argument("-o", "--out", default="bench.json", help="where to write the JSON report")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    ports = scanner.parse_ports(args.ports)
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(sorted(unknown))}")
+    concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    report = run_benchmark(args.hosts, ports, args.open, args.filtered, engines, concurrency, args.seed)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Report written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+
+# How long to wait for a server that talks first (SSH, SMTP, FTP, ...)
+GREETING_TIMEOUT = 1.0
+# Overall budget for fingerprinting one port
+FINGERPRINT_TIMEOUT = 3.0
+# Fingerprints older than this are dropped from the cache
+CACHE_TTL = 24 * 60 * 60
+MAX_BANNER = 1024
+
+HTTP_HEAD = b"HEAD / HTTP/1.0\r\n\r\n"
+
+def guess_service(banner):
+    """Name the service from the first thing it said."""
+    text = banner.decode("latin-1", "replace")
+    lower = text.lower()
+    if text.startswith("SSH-"):
+        return "ssh"
+    if text.startswith("HTTP/"):
+        return "http"
+    if text.startswith("220"):
+        return "ftp" if "ftp" in lower else "smtp"
+    if text.startswith("+OK"):
+        return "pop3"
+    if text.startswith("* OK"):
+        return "imap"
+    return "unknown"
+
+def first_line(banner):
+    return banner.decode("latin-1", "replace").split("\n", 1)[0].strip()
+
+def banner_digest(response):
+    """Hash of what identified the service, minus the parts that change per request.
+
+    Only the head is kept (everything before a blank line), and HTTP's
+    Date header is dropped, so the same server hashes the same each time.
+    """
+    head = response.split(b"\r\n\r\n", 1)[0]
+    lines = [line for line in head.splitlines() if not line.lower().startswith(b"date:")]
+    return hashlib.sha1(b"\n".join(lines)).hexdigest()
+
+class FingerprintCache:
+    """On-disk fingerprints keyed by (host, port, banner hash), evicted after `ttl` seconds.
+
+    get() looks up by (host, port) and returns the stored banner hash
+    with the result; probe_service treats a hash that no longer matches
+    the live banner as a miss, so a replaced service is fingerprinted
+    again. Writes are committed in batches. Call flush() or close() to
+    commit the rest.
+    """
+
+    def __init__(self, path, ttl=CACHE_TTL, batch=100):
+        self.ttl = ttl
+        self.batch = batch
+        self.pending = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS banners ("
+            " host TEXT, port INTEGER, digest TEXT, quiet INTEGER, result TEXT, stored REAL,"
+            " PRIMARY KEY (host, port))"
+        )
+        self.evict()
+
+    def get(self, host, port):
+        """{"digest", "quiet", "result"} for the port, or None."""
+        row = self.db.execute(
+            "SELECT digest, quiet, result FROM banners WHERE host = ? AND port = ? AND stored >= ?",
+            (host, port, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"digest": row[0], "quiet": bool(row[1]), "result": json.loads(row[2])}
+
+    def put(self, host, port, digest, quiet, result):
+        self.db.execute(
+            "INSERT OR REPLACE INTO banners VALUES (?, ?, ?, ?, ?, ?)",
+            (host, port, digest, int(quiet), json.dumps(result), time.time()),
+        )
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.flush()
+
+    def evict(self):
+        self.db.execute("DELETE FROM banners WHERE stored < ?", (time.time() - self.ttl,))
+        self.db.commit()
+
+    def flush(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+async def read_some(reader, timeout):
+    try:
+        return await asyncio.wait_for(reader.read(MAX_BANNER), timeout)
+    except asyncio.TimeoutError:
+        return b""
+
+async def grab_banner(host, port, ask_first=False):
+    """(response, quiet): the greeting, or the answer to an HTTP HEAD if the server stays quiet.
+
+    ask_first sends the HEAD straight away, skipping the wait for a
+    greeting, for a port already known to be quiet.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        response = b"" if ask_first else await read_some(reader, GREETING_TIMEOUT)
+        quiet = not response
+        if quiet:
+            # Client-speaks-first protocol; HTTP is by far the most common
+            writer.write(HTTP_HEAD)
+            await writer.drain()
+            response = await read_some(reader, GREETING_TIMEOUT)
+        return response, quiet
+    finally:
+        writer.close()
+
+async def probe_service(host, port, cache=None):
+    """Identify the service on an open port.
+
+    Returns {"service", "banner", "cached"}. With a cache, the port is
+    asked the way that worked last time (a quiet port gets its HEAD
+    without the GREETING_TIMEOUT wait) and the stored result is reused
+    when the banner hash still matches.
+    """
+    cached = cache.get(host, port) if cache is not None else None
+    if cached is not None:
+        response, quiet = await grab_banner(host, port, ask_first=cached["quiet"])
+        if banner_digest(response) == cached["digest"]:
+            return {**cached["result"], "cached": True}
+        if cached["quiet"]:
+            # Something else answers now; it may talk first, so start over
+            response, quiet = await grab_banner(host, port)
+    else:
+        response, quiet = await grab_banner(host, port)
+
+    result = {"service": guess_service(response), "banner": first_line(response)}
+    if cache is not None:
+        cache.put(host, port, banner_digest(response), quiet, result)
+    return {**result, "cached": False}
+
+async def fingerprint(host, port, cache=None, timeout=FINGERPRINT_TIMEOUT):
+    """probe_service with an overall timeout; never raises for network errors."""
+    try:
+        return await asyncio.wait_for(probe_service(host, port, cache), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return {"service": None, "banner": None, "cached": False}
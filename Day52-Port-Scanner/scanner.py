@@ -1,15 +1,51 @@
+import argparse
+import asyncio
+import contextlib
+import errno
+import ipaddress
+import json
+import os
 import socket
+import sys
 import threading
+import time
+from collections import deque
 from queue import Queue
 
+from fingerprint import FingerprintCache, fingerprint
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
 # Number of threads for faster scanning
 NUM_THREADS = 100
 
-# Queue to store ports
-queue = Queue()
-open_ports = []
+# Max probes in flight for the asyncio engine
+ASYNC_CONCURRENCY = 5000
+# Max probes in flight against any single host during a sweep
+PER_HOST_CONCURRENCY = 256
+PROBE_TIMEOUT = 0.5
+# Bounds for the adaptive per-host timeout
+MIN_TIMEOUT = 0.02
+MAX_TIMEOUT = 3.0
+# Probes in flight when a scan starts; the window grows from here
+INITIAL_WINDOW = 64
+MIN_WINDOW = 8
+# Open ports fingerprinted at once when --fingerprint is on
+FINGERPRINT_CONCURRENCY = 100
+# Ports per checkpoint unit when streaming results
+BLOCK_SIZE = 256
+# Sockets one select() call can watch on Windows (CPython's FD_SETSIZE there)
+WINDOWS_SELECT_LIMIT = 512
+# File descriptors kept out of the probe budget: fingerprint connections plus files and stdio
+RESERVED_FDS = FINGERPRINT_CONCURRENCY + 64
+# Wait before retrying a probe that hit a local resource error; doubles up to the max
+RESOURCE_BACKOFF = 0.01
+MAX_RESOURCE_BACKOFF = 1.0
 
-def port_scan(host, port):
+def port_scan(host, port, open_ports):
     """Try connecting to a port on given host."""
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -22,37 +58,602 @@ def port_scan(host, port):
     except Exception as e:
         pass
 
-def worker(host):
+def worker(host, queue, open_ports):
     """Thread worker function."""
     while not queue.empty():
         port = queue.get()
-        port_scan(host, port)
+        port_scan(host, port, open_ports)
         queue.task_done()
 
 def run_scanner(host, port_range=(1, 1024)):
     print(f"\n🔎 Scanning host {host} from port {port_range[0]} to {port_range[1]}...\n")
-    
+
+    # Per-call state so the scanner can be run more than once per process
+    queue = Queue()
+    open_ports = []
     for port in range(port_range[0], port_range[1] + 1):
         queue.put(port)
 
     threads = []
     for _ in range(NUM_THREADS):
-        t = threading.Thread(target=worker, args=(host,))
+        t = threading.Thread(target=worker, args=(host, queue, open_ports))
         t.start()
         threads.append(t)
 
     queue.join()
 
+    open_ports.sort()
+    print_summary(open_ports)
+    return open_ports
+
+def print_summary(ports):
     print("\n Scan complete!")
-    if open_ports:
-        print("Open ports:", open_ports)
+    if ports:
+        print("Open ports:", ports)
     else:
         print("No open ports found.")
 
-if __name__ == "__main__":
-    target = input("Enter target host (IP or domain): ").strip()
+# --- asyncio engine ---
+
+def max_concurrency(requested):
+    """Cap in-flight probes so we never run out of file descriptors.
+
+    RESERVED_FDS are left for everything else: the fingerprint stage's
+    connections, the cache and output files, stdio.
+    """
+    if resource is None:
+        # Windows: the selector loop's select() takes at most 512 sockets
+        return max(min(requested, WINDOWS_SELECT_LIMIT - RESERVED_FDS), 1)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = requested + RESERVED_FDS
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        # Try to raise the soft limit before giving up concurrency
+        target = needed if hard == resource.RLIM_INFINITY else min(hard, needed)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+        requested = min(requested, soft - RESERVED_FDS)
+    return max(requested, 1)
+
+def new_event_loop():
+    """A loop async_probe works on. It waits with add_writer, which Windows'
+    default Proactor loop lacks, so Windows gets a selector loop."""
+    return asyncio.SelectorEventLoop() if os.name == "nt" else asyncio.new_event_loop()
+
+def run_async(coro):
+    """asyncio.run on new_event_loop(); the process-wide loop policy is left alone."""
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        return runner.run(coro)
+
+def _wake(waiter, value):
+    if not waiter.done():
+        waiter.set_result(value)
+
+if os.name == "nt":
+    IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK)
+else:
+    IN_PROGRESS = (errno.EINPROGRESS,)
+
+# Errors that mean *we* are out of sockets or buffers, not that the port is closed
+RESOURCE_ERRORS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL}
+
+async def async_probe(host, port, timeout=PROBE_TIMEOUT):
+    """Non-blocking connect to a port.
+
+    Returns "open", "closed" (refused or unreachable) or "filtered" (no
+    answer within `timeout`). Raises OSError when the local machine runs
+    out of resources, so the caller can back off and retry the port.
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
     try:
-        ip = socket.gethostbyname(target)  # resolve domain to IP
-        run_scanner(ip, (1, 1024))  # scan common range
+        err = sock.connect_ex((host, port))
+        if err in IN_PROGRESS:
+            # Wait for writability directly instead of wrapping every probe in a task
+            waiter = loop.create_future()
+            fd = sock.fileno()
+            loop.add_writer(fd, _wake, waiter, True)
+            timer = loop.call_later(timeout, _wake, waiter, False)
+            try:
+                if not await waiter:
+                    return "filtered"
+            finally:
+                loop.remove_writer(fd)
+                timer.cancel()
+            err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err in RESOURCE_ERRORS:
+            raise OSError(err, os.strerror(err))
+        return "open" if err == 0 else "closed"
+    finally:
+        sock.close()
+
+# --- adaptive timing ---
+
+class RttEstimator:
+    """Per-host connect timeout from smoothed RTT samples (SRTT/RTTVAR, RFC 6298)."""
+
+    def __init__(self, initial=PROBE_TIMEOUT):
+        self.initial = initial
+        self.srtt = None
+        self.rttvar = None
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(max(self.srtt + 4 * self.rttvar, MIN_TIMEOUT), MAX_TIMEOUT)
+
+class CongestionWindow:
+    """AIMD limit on probes in flight.
+
+    The window grows by one per answered probe until the first cut (slow
+    start), then by about one per round. A round is one window's worth of
+    finished probes. The window halves when a round's timeout ratio jumps
+    above its running baseline, or when the OS runs out of sockets. A host
+    that is mostly filtered just raises the baseline and does not shrink the
+    window. The window is cut at most once per round.
+    """
+
+    def __init__(self, maximum, initial=INITIAL_WINDOW, minimum=MIN_WINDOW):
+        self.max = maximum
+        self.min = min(minimum, maximum)
+        self.size = float(max(min(initial, maximum), self.min))
+        self.ssthresh = float(maximum)
+        self.in_flight = 0
+        self.round = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.loss_baseline = None
+        self._last_cut = -1
+        self._waiters = deque()
+
+    async def acquire(self):
+        while self.in_flight >= int(self.size):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def on_result(self, timed_out):
+        self.completed += 1
+        if timed_out:
+            self.timeouts += 1
+        elif self.size < self.ssthresh:
+            self.size = min(self.size + 1, self.max)
+        else:
+            self.size = min(self.size + 1 / self.size, self.max)
+
+        if self.completed >= self.size:
+            ratio = self.timeouts / self.completed
+            if self.loss_baseline is not None and ratio > self.loss_baseline * 1.5 + 0.05:
+                self._cut()
+            self.loss_baseline = ratio if self.loss_baseline is None else 0.875 * self.loss_baseline + 0.125 * ratio
+            self.round += 1
+            self.completed = self.timeouts = 0
+
+    def on_resource_error(self):
+        self._cut()
+
+    def _cut(self):
+        if self._last_cut == self.round:
+            return
+        self._last_cut = self.round
+        self.ssthresh = max(self.size / 2, self.min)
+        self.size = self.ssthresh
+
+    def _wake(self):
+        free = int(self.size) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+class RateLimiter:
+    """Spaces probe starts so no more than `rate` go out per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_slot = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# --- streaming results ---
+
+class ScanCheckpoint:
+    """Append-only log of finished (host, port-block) units.
+
+    Each unit is written once all of its probes are done and its open
+    ports have been handed to the consumer, so a restarted scan can skip
+    it. Resume with the same port list and block size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    host, _, start = line.strip().partition(" ")
+                    if start.isdigit():  # ignore a torn last line
+                        self.done.add((host, int(start)))
+        self._file = open(path, "a")
+
+    def __contains__(self, unit):
+        return unit in self.done
+
+    def mark(self, unit):
+        # Only units from a previous run are kept in memory
+        self._file.write(f"{unit[0]} {unit[1]}\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def schedule(hosts, ports, block_size, remaining, checkpoint=None):
+    """Yield (unit, host, port) probes port-major, one port block at a time."""
+    for i in range(0, len(ports), block_size):
+        block = ports[i:i + block_size]
+        units = {host: (host, block[0]) for host in hosts}
+        for unit in units.values():
+            if checkpoint is None or unit not in checkpoint:
+                remaining[unit] = len(block)
+        for port in block:
+            for host in hosts:
+                unit = units[host]
+                if unit in remaining:
+                    yield unit, host, port
+
+async def adaptive_probe(host, port, rtt, window, rate):
+    """Probe one port under the congestion window, retrying on local resource errors.
+
+    A retry waits first, with exponential backoff, so sockets held
+    elsewhere get a chance to close instead of the loop spinning.
+    """
+    backoff = RESOURCE_BACKOFF
+    while True:
+        await window.acquire()
+        try:
+            if rate is not None:
+                await rate.wait()
+            start = time.perf_counter()
+            state = await async_probe(host, port, rtt.timeout)
+            latency = time.perf_counter() - start
+        except OSError as e:
+            if e.errno not in RESOURCE_ERRORS:
+                raise
+            window.on_resource_error()
+            state = None
+        finally:
+            window.release()
+        if state is None:
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RESOURCE_BACKOFF)
+            continue
+        if state != "filtered":
+            rtt.update(latency)
+        window.on_result(state == "filtered")
+        return state, latency
+
+async def finish_probe(unit, remaining, events):
+    remaining[unit] -= 1
+    if not remaining[unit]:
+        del remaining[unit]
+        await events.put(("done", unit))
+
+async def stream_worker(probes, limits, rtts, window, rate, remaining, events, found=None):
+    """Probe until the scheduler is exhausted, reporting opens and finished units.
+
+    With fingerprinting on, open ports are handed to the second stage via
+    `found` instead, and that stage reports them.
+    """
+    for unit, host, port in probes:
+        async with limits[host]:
+            state, latency = await adaptive_probe(host, port, rtts[host], window, rate)
+        if state == "open":
+            record = {
+                "host": host,
+                "port": port,
+                "latency_ms": round(latency * 1000, 3),
+                "ts": time.time(),
+            }
+            if found is not None:
+                await found.put((unit, record))
+                continue
+            await events.put(("open", record))
+        await finish_probe(unit, remaining, events)
+
+async def fingerprint_worker(found, cache, remaining, events):
+    """Second pipeline stage: fingerprint open ports while probing carries on."""
+    while (item := await found.get()) is not None:
+        unit, record = item
+        record.update(await fingerprint(record["host"], record["port"], cache))
+        await events.put(("open", record))
+        await finish_probe(unit, remaining, events)
+
+async def stream_scan(hosts, ports, concurrency=ASYNC_CONCURRENCY, per_host=PER_HOST_CONCURRENCY,
+                      timeout=PROBE_TIMEOUT, checkpoint=None, block_size=BLOCK_SIZE, rate=None,
+                      fingerprints=False, cache=None):
+    """Async generator yielding one record per open port as soon as it is found.
+
+    Records look like {"host", "port", "latency_ms", "ts"}; with
+    `fingerprints` on they also carry "service", "banner" and "cached",
+    using `cache` (a FingerprintCache) when given. Nothing is
+    accumulated here, so memory stays flat however many hosts are swept;
+    a slow consumer simply holds the probes back.
+
+    `concurrency` is the ceiling for the congestion window and `timeout`
+    the per-host timeout until that host has answered a probe. `rate`
+    optionally caps probes per second.
+    """
+    hosts = list(hosts)
+    ports = list(ports)
+    limits = {host: asyncio.Semaphore(per_host) for host in hosts}
+    rtts = {host: RttEstimator(timeout) for host in hosts}
+    remaining = {}
+    workers = min(max_concurrency(concurrency), len(hosts) * len(ports))
+    window = CongestionWindow(max(workers, 1))
+    limiter = RateLimiter(rate) if rate else None
+    events = asyncio.Queue(maxsize=max(workers, 1))
+    found = asyncio.Queue(maxsize=FINGERPRINT_CONCURRENCY * 2) if fingerprints else None
+    probes = schedule(hosts, ports, block_size, remaining, checkpoint)
+
+    async def pipeline():
+        stage2 = [asyncio.create_task(fingerprint_worker(found, cache, remaining, events))
+                  for _ in range(FINGERPRINT_CONCURRENCY if fingerprints else 0)]
+        try:
+            await asyncio.gather(*(stream_worker(probes, limits, rtts, window, limiter, remaining, events, found)
+                                   for _ in range(workers)))
+            for _ in stage2:
+                await found.put(None)
+            await asyncio.gather(*stage2)
+        finally:
+            for task in stage2:
+                task.cancel()
+
+    async def run():
+        try:
+            await pipeline()
+        except asyncio.CancelledError:
+            # The consumer has gone away; nobody is waiting for the sentinel
+            raise
+        except Exception:
+            await events.put(None)
+            raise
+        await events.put(None)
+
+    runner = asyncio.create_task(run())
+    try:
+        while (event := await events.get()) is not None:
+            kind, value = event
+            if kind == "open":
+                yield value
+            elif checkpoint is not None:
+                # Every earlier record has been consumed by the time we get here
+                checkpoint.mark(value)
+        await runner
+    finally:
+        if not runner.done():
+            runner.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await runner
+
+def iter_scan(hosts, ports, **kwargs):
+    """Blocking iterator over stream_scan for callers without an event loop.
+
+    Probing pauses while the caller handles each record.
+    """
+    loop = new_event_loop()
+    records = stream_scan(hosts, ports, **kwargs)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(records.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(records.aclose())
+        loop.close()
+
+async def write_ndjson(records, out, written=()):
+    """Write each record as a JSON line, flushing so readers see it at once.
+
+    Records whose (host, port) is in `written` are skipped.
+    """
+    count = 0
+    async for record in records:
+        if (record["host"], record["port"]) in written:
+            continue
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        count += 1
+    return count
+
+async def async_sweep(hosts, ports, concurrency=ASYNC_CONCURRENCY,
+                      per_host=PER_HOST_CONCURRENCY, timeout=PROBE_TIMEOUT, rate=None,
+                      fingerprints=False, cache=None):
+    """Scan every host/port pair through one pool of probes.
+
+    Probes are issued port-major, so consecutive probes land on different
+    hosts and the global budget stays busy while each host is held to
+    `per_host` connects in flight. Returns {host: sorted open ports}.
+    """
+    hosts = list(hosts)
+    results = {host: [] for host in hosts}
+    async for record in stream_scan(hosts, ports, concurrency, per_host, timeout, rate=rate,
+                                    fingerprints=fingerprints, cache=cache):
+        service = f" ({record['service']}: {record['banner']})" if record.get("service") else ""
+        print(f"[+] {record['host']}:{record['port']} is OPEN{service}")
+        results[record["host"]].append(record["port"])
+    for found in results.values():
+        found.sort()
+    return results
+
+async def async_scan(host, port_range=(1, 1024), concurrency=ASYNC_CONCURRENCY, timeout=PROBE_TIMEOUT):
+    """Scan a port range with at most `concurrency` connects in flight."""
+    ports = range(port_range[0], port_range[1] + 1)
+    results = await async_sweep([host], ports, concurrency, concurrency, timeout)
+    return results[host]
+
+def run_async_scanner(host, port_range=(1, 1024), concurrency=ASYNC_CONCURRENCY):
+    print(f"\n🔎 Scanning host {host} from port {port_range[0]} to {port_range[1]}...\n")
+    found = run_async(async_scan(host, port_range, concurrency))
+    print_summary(found)
+    return found
+
+# --- multi-host sweep ---
+
+def expand_targets(targets):
+    """Turn hostnames, IPs and CIDR blocks into a de-duplicated list of IPs."""
+    hosts = []
+    seen = set()
+    for target in targets:
+        for part in target.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "/" in part:
+                network = ipaddress.IPv4Network(part, strict=False)
+                addresses = [str(ip) for ip in network.hosts()] or [str(network.network_address)]
+            else:
+                addresses = [socket.gethostbyname(part)]
+            for ip in addresses:
+                if ip not in seen:
+                    seen.add(ip)
+                    hosts.append(ip)
+    return hosts
+
+def parse_ports(spec):
+    """Parse a port list like "22,80,8000-8100" into sorted unique ports."""
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(p) for p in part.split("-", 1))
+            ports.update(range(start, end + 1))
+        else:
+            ports.add(int(part))
+    if not ports or min(ports) < 1 or max(ports) > 65535:
+        raise ValueError(f"Invalid port list: {spec}")
+    return sorted(ports)
+
+def run_sweep(targets, ports, concurrency=ASYNC_CONCURRENCY, per_host=PER_HOST_CONCURRENCY, rate=None,
+              fingerprints=False, cache=None):
+    hosts = expand_targets(targets)
+    print(f"\n🔎 Sweeping {len(hosts)} host(s) x {len(ports)} port(s)...\n")
+    results = run_async(async_sweep(hosts, ports, concurrency, per_host, rate=rate,
+                                      fingerprints=fingerprints, cache=cache))
+
+    print("\n Sweep complete!")
+    for host, found in results.items():
+        if found:
+            print(f"{host}: {found}")
+    if not any(results.values()):
+        print("No open ports found.")
+    return results
+
+def read_ndjson_ports(path):
+    """{(host, port)} already written to an NDJSON results file, for resuming into it.
+
+    A unit interrupted part way was written partly before it is scanned
+    again, so the resumed run skips what is here. A torn last line is
+    ignored and ended, so the next record starts on a line of its own.
+    """
+    written = set()
+    if not os.path.exists(path):
+        return written
+    with open(path, "rb+") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                written.add((record["host"], record["port"]))
+            except (ValueError, KeyError, TypeError):
+                pass
+        if f.tell() and not line.endswith(b"\n"):
+            f.write(b"\n")
+    return written
+
+def run_stream(targets, ports, out_path, checkpoint_path=None,
+               concurrency=ASYNC_CONCURRENCY, per_host=PER_HOST_CONCURRENCY, rate=None,
+               fingerprints=False, cache=None):
+    """Stream open ports to an NDJSON file ("-" for stdout), resumable via a checkpoint."""
+    hosts = expand_targets(targets)
+    checkpoint = ScanCheckpoint(checkpoint_path) if checkpoint_path else None
+    # A resumed scan appends to the results it already wrote, without repeating any of them
+    written = read_ndjson_ports(out_path) if checkpoint and out_path != "-" else set()
+    out = sys.stdout if out_path == "-" else open(out_path, "a" if checkpoint else "w")
+    print(f"🔎 Streaming {len(hosts)} host(s) x {len(ports)} port(s) to {out_path}", file=sys.stderr)
+    try:
+        records = stream_scan(hosts, ports, concurrency, per_host, checkpoint=checkpoint, rate=rate,
+                              fingerprints=fingerprints, cache=cache)
+        count = run_async(write_ndjson(records, out, written))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if checkpoint:
+            checkpoint.close()
+    print(f"Scan complete! {count} open port(s) written.", file=sys.stderr)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Simple TCP port scanner")
+    parser.add_argument("targets", nargs="*", help="hosts, IPs or CIDR blocks (prompted if omitted)")
+    parser.add_argument("-p", "--ports", default="1-1024", help='port list, e.g. "22,80,8000-8100"')
+    parser.add_argument("-c", "--concurrency", type=int, default=ASYNC_CONCURRENCY,
+                        help="ceiling for probes in flight overall (adjusted automatically below it)")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY,
+                        help="max probes in flight per host")
+    parser.add_argument("--rate", type=float, metavar="PPS",
+                        help="cap on probes sent per second")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="grab banners and identify services on open ports")
+    parser.add_argument("--cache", metavar="PATH", default="fingerprints.db",
+                        help="fingerprint cache database (default: %(default)s)")
+    parser.add_argument("--ndjson", metavar="PATH",
+                        help='stream open ports as NDJSON to PATH ("-" for stdout)')
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="record finished port blocks here and skip them when resuming; "
+                             "the resumed scan appends to --ndjson, skipping ports it already lists")
+    args = parser.parse_args()
+
+    targets = args.targets or [input("Enter target host (IP or domain): ").strip()]
+    cache = FingerprintCache(args.cache) if args.fingerprint else None
+    try:
+        ports = parse_ports(args.ports)
+        if args.ndjson:
+            run_stream(targets, ports, args.ndjson, args.checkpoint,
+                       args.concurrency, args.per_host, args.rate, args.fingerprint, cache)
+        else:
+            run_sweep(targets, ports, args.concurrency, args.per_host, args.rate, args.fingerprint, cache)
     except socket.gaierror:
         print("❌ Invalid hostname. Please try again.")
+    except ValueError as e:
+        print(f"❌ {e}")
+    finally:
+        if cache:
+            cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,74 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 import pandas as pd
-from utils.data_utils import read_prices, read_salaries, compute_correlation
+from utils.data_utils import get_dataset, get_correlation, get_rolling_correlation, query_dataset
+from utils.export import StaticExports, window_name
+from utils.http_cache import PayloadCache, make_payload, send_payload
+from utils.instrumentation import instrument
 
 app = Flask(__name__)
-CORS(app)
+# Paged /api responses report the unpaged row count in X-Total-Count
+CORS(app, expose_headers=["X-Total-Count"])
+instrument(app)  # per-route and per-stage timings at /metrics
+
+# Encoded /api responses, built once per version of the CSVs they come from
+payloads = PayloadCache()
+# Responses written by `python -m utils.export`, sent while the CSVs match them
+exports = StaticExports()
+
+
+def int_arg(name, default=None):
+    """?name= as an int; raises ValueError naming the argument when it isn't one."""
+    value = request.args.get(name, '')
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def dataset_response(name):
+    """The whole dataset, or a slice of it when any query argument is given.
+
+    ?start=&end= year range, ?columns=milk,fuel projection,
+    ?freq=yearly|quarterly means, ?offset=&limit= paging.
+    """
+    if not request.args:
+        payload = exports.payload(name)
+        if payload is None:
+            snapshot = get_dataset(name)
+            payload = payloads.get(
+                (name, snapshot.version),
+                lambda: make_payload(snapshot.json, snapshot.version[0]),
+            )
+        return send_payload(payload)
+
+    snapshot = get_dataset(name)
+    try:
+        start = int_arg('start')
+        end = int_arg('end')
+        offset = int_arg('offset', 0)
+        limit = int_arg('limit')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = [c for c in request.args.get('columns', '').split(',') if c]
+    freq = request.args.get('freq') or None
+    if offset < 0 or (limit is not None and limit < 1):
+        return jsonify({"error": "offset must be >= 0 and limit >= 1"}), 400
+
+    def build():
+        body, total = query_dataset(name, start, end, columns, freq, offset, limit)
+        return make_payload(body, snapshot.version[0]), total
+
+    key = (name, start, end, tuple(columns), freq, offset, limit, snapshot.version)
+    try:
+        payload, total = payloads.get(key, build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = send_payload(payload)
+    response.headers["X-Total-Count"] = str(total)
+    return response
 
 
 @app.route('/')
@@ -14,20 +78,47 @@ def index():
 
 @app.route('/api/prices')
 def api_prices():
-    df = read_prices()
-    return jsonify(df.to_dict(orient='records'))  # ✅ wrap in jsonify
+    return dataset_response("prices")
 
 
 @app.route('/api/salaries')
 def api_salaries():
-    df = read_salaries()
-    return jsonify(df.to_dict(orient='records'))  # ✅ wrap in jsonify
+    return dataset_response("salaries")
 
 
 @app.route('/api/correlation')
 def api_correlation():
-    corr = compute_correlation()
-    return jsonify({"correlation": corr})  # ✅ jsonify dict properly
+    # ?start=2018&end=2022 limits the years; ?window=3 gives rolling correlations
+    try:
+        start = int_arg('start')
+        end = int_arg('end')
+        window = int_arg('window')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if window is not None and window < 2:
+        return jsonify({"error": "window must be at least 2 years"}), 400
+
+    def build():
+        result = get_rolling_correlation(window) if window is not None else get_correlation(start, end)
+        return make_payload(app.json.dumps(result).encode(), max(v[0] for v in versions))
+
+    if start is None and end is None:
+        exported = exports.payload("correlation" if window is None else window_name(window))
+        if exported is not None:
+            return send_payload(exported)
+
+    versions = (get_dataset("prices").version, get_dataset("salaries").version)
+    return send_payload(payloads.get(("correlation", start, end, window, versions), build))
+
+
+@app.route('/static/data/<filename>')
+def exported_file(filename):
+    # Hashed export files get their precompressed copy and a long cache lifetime;
+    # anything else under static/data (manifest.json, older exports) is a plain static file
+    payload = exports.file_payload(filename)
+    if payload is None:
+        return app.send_static_file(f"data/{filename}")
+    return send_payload(payload, immutable=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports `utils` relative to its own folder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils import data_utils
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    """Point the prices/salaries datasets at CSVs written by the test."""
+    paths = {name: tmp_path / f"{name}.csv" for name in ("prices", "salaries")}
+    for name, path in paths.items():
+        monkeypatch.setitem(data_utils.DATASETS, name, data_utils.Dataset(str(path)))
+    monkeypatch.setattr(data_utils, "CORRELATION", data_utils.CorrelationService())
+
+    def write(name, rows):
+        path = paths[name]
+        pd.DataFrame(rows).to_csv(path, index=False)
+        # Rewrites within one mtime tick must still look like a new version
+        write.tick += 1
+        mtime_ns = path.stat().st_mtime_ns + write.tick * 1_000_000_000
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    write.tick = 0
+    return write
+
+
+SALARIES = [
+    {"year": year, "avg_salary": salary}
+    for year, salary in [(2016, 300), (2017, 320), (2018, 350), (2019, 345)]
+]
+
+
+def test_monthly_prices_are_averaged_per_year(datasets):
+    rows = []
+    for year, base in [(2016, 40), (2017, 42), (2018, 47), (2019, 46)]:
+        for month in range(1, 13):
+            rows.append({"year": year, "month": month, "milk": base + (month - 6.5) / 10})
+    datasets("prices", rows)
+    datasets("salaries", SALARIES)
+
+    result = data_utils.get_correlation()
+    # month is a key, not a price
+    assert list(result["correlation"]) == ["milk"]
+    assert result["n"] == 4
+    expected = pd.Series([40, 42, 47, 46]).corr(pd.Series([300, 320, 350, 345]))
+    assert result["correlation"]["milk"]["avg_salary"] == pytest.approx(expected)
+
+
+def test_duplicate_years_are_averaged_and_appends_stay_incremental(datasets):
+    prices = [
+        {"year": 2016, "milk": 39}, {"year": 2016, "milk": 41},
+        {"year": 2017, "milk": 42},
+        {"year": 2018, "milk": 46}, {"year": 2018, "milk": 48},
+    ]
+    datasets("prices", prices)
+    datasets("salaries", SALARIES)
+    stats = data_utils.CORRELATION.stats()
+    assert stats.years == [2016, 2017, 2018]
+
+    datasets("prices", prices + [{"year": 2019, "milk": 45}, {"year": 2019, "milk": 47}])
+    assert data_utils.CORRELATION.stats() is stats
+    result = data_utils.get_correlation()
+    expected = pd.Series([40, 42, 47, 46]).corr(pd.Series([300, 320, 350, 345]))
+    assert result["n"] == 4
+    assert result["correlation"]["milk"]["avg_salary"] == pytest.approx(expected)
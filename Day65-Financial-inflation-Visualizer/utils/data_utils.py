@@ -1,14 +1,467 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+import numpy as np
 import pandas as pd
 
+from utils.instrumentation import timed
+
 PRICES_CSV = "data/prices.csv"
 SALARIES_CSV = "data/salaries.csv"
 
+# Built by `python -m utils.data_utils build`; see read_frame
+COLUMNAR_SUFFIX = ".columns"
+COLUMNAR_HEADER = "header.json"
+
+# Columns that place a row in time; everything else numeric is data
+KEY_COLUMNS = ("year", "month")
+# Aggregations accepted by query_dataset; quarterly needs a month column
+FREQUENCIES = ("yearly", "quarterly")
+
+# frame: the parsed DataFrame sorted by year (then month), shared by every caller,
+#        so treat it as read-only
+# json: frame serialized as a JSON array of records, ready to send as a response body
+# version: (mtime_ns, size) of the file it was read from
+# years: frame's year column as a sorted array, for binary search by year range
+Snapshot = namedtuple("Snapshot", ["frame", "json", "version", "years"])
+
+
+# --- columnar store ---
+# Each CSV can have a sibling directory (data/prices.columns/) holding one
+# .npy file per column plus header.json, which records the CSV's mtime and
+# size when it was built. Columns are memory-mapped, so loading one costs a
+# page-in, not a parse. A header that doesn't match the CSV means the store
+# is stale, and the CSV is read instead until the store is rebuilt.
+
+def columnar_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + COLUMNAR_SUFFIX
+
+
+def csv_version(csv_path):
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_columnar(csv_path):
+    """Write (or refresh) the columnar copy of a CSV and return its header."""
+    version = csv_version(csv_path)
+    frame = pd.read_csv(csv_path)
+    directory = columnar_dir(csv_path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Every build writes new files; rewriting one a running server has
+    # memory-mapped would pull pages out from under it (SIGBUS), while the
+    # old files can be unlinked safely once the new header is in place
+    build = os.urandom(4).hex()
+    columns = []
+    for i, name in enumerate(frame.columns):
+        values = frame[name].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)  # fixed-width unicode, loadable without pickle
+        filename = f"{version[0]}-{build}-{i}.npy"
+        np.save(os.path.join(directory, filename), values, allow_pickle=False)
+        columns.append({"name": name, "file": filename, "dtype": values.dtype.str})
+
+    header = {
+        "source": os.path.basename(csv_path),
+        "mtime_ns": version[0],
+        "size": version[1],
+        "rows": len(frame),
+        "columns": columns,
+    }
+    header_path = os.path.join(directory, COLUMNAR_HEADER)
+    tmp_path = f"{header_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp_path, header_path)
+
+    keep = {c["file"] for c in columns} | {COLUMNAR_HEADER}
+    for name in os.listdir(directory):
+        if name not in keep:
+            os.unlink(os.path.join(directory, name))
+    return header
+
+
+def read_columnar_header(csv_path, version=None):
+    """The store's header, or None when it is missing or older than the CSV."""
+    try:
+        with open(os.path.join(columnar_dir(csv_path), COLUMNAR_HEADER)) as f:
+            header = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if version is None:
+        version = csv_version(csv_path)
+    if (header["mtime_ns"], header["size"]) != tuple(version):
+        return None
+    return header
+
+
+def load_columns(csv_path, names=None, version=None):
+    """{column: read-only memmap} straight from the store, or None if it is stale."""
+    header = read_columnar_header(csv_path, version)
+    if header is None:
+        return None
+    directory = columnar_dir(csv_path)
+    return {
+        c["name"]: np.load(os.path.join(directory, c["file"]), mmap_mode="r", allow_pickle=False)
+        for c in header["columns"]
+        if names is None or c["name"] in names
+    }
+
+
+def read_frame(csv_path, version=None):
+    """The CSV as a DataFrame, from the columnar store when it is fresh."""
+    columns = load_columns(csv_path, version=version)
+    if columns is None:
+        return pd.read_csv(csv_path)
+    # Wrapping each memmap in a Series keeps pandas from copying them into one block
+    return pd.DataFrame({name: pd.Series(values, copy=False) for name, values in columns.items()}, copy=False)
+
+
+class Dataset:
+    """A CSV file parsed once and kept in memory.
+
+    The file is stat'ed on every access and re-read only when its mtime
+    or size has changed. A snapshot is replaced whole, so a reader never
+    sees a frame from one version with the JSON from another.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        version = csv_version(self.path)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                with timed("load"):
+                    frame = read_frame(self.path, version)
+                keys = [c for c in KEY_COLUMNS if c in frame.columns]
+                if not pd.MultiIndex.from_frame(frame[keys]).is_monotonic_increasing:
+                    frame = frame.sort_values(keys, kind="stable").reset_index(drop=True)
+                with timed("serialize"):
+                    json = frame.to_json(orient="records").encode()
+                years = frame["year"].to_numpy()
+                snapshot = self._snapshot = Snapshot(frame, json, version, years)
+            return snapshot
+
+
+DATASETS = {
+    "prices": Dataset(PRICES_CSV),
+    "salaries": Dataset(SALARIES_CSV),
+}
+
+
+def get_dataset(name):
+    return DATASETS[name].snapshot()
+
+
+@timed("query")
+def query_dataset(name, start=None, end=None, columns=None, freq=None, offset=0, limit=None):
+    """One page of a dataset as (JSON records, total rows before paging).
+
+    start/end pick an inclusive year range by binary search on the sorted
+    year index, so only that slice is touched. columns projects it (the
+    year/month keys are always kept), and freq averages it per year or
+    quarter. Raises ValueError for a column or frequency the data can't
+    give.
+    """
+    snapshot = get_dataset(name)
+    frame = snapshot.frame
+    keys = [c for c in KEY_COLUMNS if c in frame.columns]
+
+    i = np.searchsorted(snapshot.years, start, side="left") if start is not None else 0
+    j = np.searchsorted(snapshot.years, end, side="right") if end is not None else len(frame)
+    rows = frame.iloc[i:max(i, j)]
+
+    if columns:
+        unknown = [c for c in columns if c not in frame.columns]
+        if unknown:
+            raise ValueError(f"unknown column(s): {', '.join(unknown)}")
+        rows = rows[keys + [c for c in columns if c not in keys]]
+
+    if freq is not None:
+        if freq not in FREQUENCIES:
+            raise ValueError(f"freq must be one of: {', '.join(FREQUENCIES)}")
+        if freq == "quarterly":
+            if "month" not in frame.columns:
+                raise ValueError(f"{name} has one row per year; quarterly needs a month column")
+            rows = rows.assign(quarter=(rows["month"] - 1) // 3 + 1).drop(columns="month")
+            groups = ["year", "quarter"]
+        else:
+            rows = rows.drop(columns=[c for c in keys if c != "year"])
+            groups = ["year"]
+        rows = rows.groupby(groups, sort=True).mean(numeric_only=True).reset_index()
+
+    total = len(rows)
+    rows = rows.iloc[offset:offset + limit if limit is not None else None]
+    return rows.to_json(orient="records").encode(), total
+
+
 def read_prices():
-    return pd.read_csv(PRICES_CSV)
+    return get_dataset("prices").frame
+
 
 def read_salaries():
-    return pd.read_csv(SALARIES_CSV)
+    return get_dataset("salaries").frame
+
+
+class CorrelationStats:
+    """Pearson correlations between price and salary columns, kept as running sums.
+
+    Rows are joined on year and appended in year order. For every pair of
+    columns the prefix sums of n, x, y, xy, x^2 and y^2 are kept. Appending
+    a year costs O(columns^2), and the correlation over any year range is
+    the difference of two prefixes.
+    """
+
+    def __init__(self, x_columns, y_columns):
+        self.x_columns = list(x_columns)
+        self.y_columns = list(y_columns)
+        self.years = []
+        # prefix[i] holds the sums over the first i rows
+        self.prefix = [None]
+        # Sums are taken relative to the first row, which keeps them small
+        # without changing the correlation
+        self._offset = None
+
+    def append(self, year, x, y):
+        if self.years and year <= self.years[-1]:
+            raise ValueError(f"year {year} is not after {self.years[-1]}")
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if self._offset is None:
+            self._offset = (x.copy(), y.copy())
+        dx = x - self._offset[0]
+        dy = y - self._offset[1]
+        row = np.concatenate(([1.0], dx, dy, np.outer(dx, dy).ravel(), dx * dx, dy * dy))
+        last = self.prefix[-1]
+        self.prefix.append(row if last is None else last + row)
+        self.years.append(year)
+
+    @property
+    def last_year(self):
+        return self.years[-1] if self.years else None
+
+    def _sums(self, start, end):
+        i = bisect_left(self.years, start) if start is not None else 0
+        j = bisect_right(self.years, end) if end is not None else len(self.years)
+        if j <= i:
+            return None
+        total = self.prefix[j] if self.prefix[i] is None else self.prefix[j] - self.prefix[i]
+        p, q = len(self.x_columns), len(self.y_columns)
+        n = total[0]
+        sx = total[1:1 + p]
+        sy = total[1 + p:1 + p + q]
+        sxy = total[1 + p + q:1 + p + q + p * q].reshape(p, q)
+        sxx = total[1 + p + q + p * q:1 + 2 * p + q + p * q]
+        syy = total[1 + 2 * p + q + p * q:]
+        return n, sx, sy, sxy, sxx, syy
+
+    def correlation(self, start=None, end=None):
+        """{x column: {y column: r}} over the years start..end, inclusive.
+
+        r is None when a column is constant over the range or fewer than
+        two years fall in it.
+        """
+        sums = self._sums(start, end)
+        matrix = {x: {y: None for y in self.y_columns} for x in self.x_columns}
+        if sums is None or sums[0] < 2:
+            return matrix
+        n, sx, sy, sxy, sxx, syy = sums
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        for a, x in enumerate(self.x_columns):
+            for b, y in enumerate(self.y_columns):
+                denom = var_x[a] * var_y[b]
+                if denom > 0:
+                    r = (n * sxy[a, b] - sx[a] * sy[b]) / math.sqrt(denom)
+                    matrix[x][y] = max(-1.0, min(1.0, float(r)))
+        return matrix
+
+    def count(self, start=None, end=None):
+        sums = self._sums(start, end)
+        return 0 if sums is None else int(sums[0])
+
+    def rolling(self, window):
+        """Correlation over every run of `window` consecutive years."""
+        return [
+            {
+                "start": self.years[i],
+                "end": self.years[i + window - 1],
+                "correlation": self.correlation(self.years[i], self.years[i + window - 1]),
+            }
+            for i in range(len(self.years) - window + 1)
+        ]
+
+
+def numeric_columns(df):
+    return [c for c in df.select_dtypes("number").columns if c not in KEY_COLUMNS]
+
+
+def yearly(df, columns):
+    """One row per year holding the mean of `columns`; monthly or repeated years are averaged."""
+    return df.groupby("year", sort=True)[columns].mean().reset_index()
+
+
+def joined_rows(prices_df, salaries_df, x_columns=None, y_columns=None):
+    """Price columns, salary columns and the yearly rows present in both, in year order.
+
+    Each side is first averaged to one row per year, since the running
+    sums take at most one row per year.
+    """
+    x_columns = numeric_columns(prices_df) if x_columns is None else x_columns
+    y_columns = numeric_columns(salaries_df) if y_columns is None else y_columns
+    merged = pd.merge(yearly(prices_df, x_columns), yearly(salaries_df, y_columns), on="year")
+    merged = merged.dropna(subset=x_columns + y_columns)
+    return (
+        x_columns,
+        y_columns,
+        merged["year"].tolist(),
+        merged[x_columns].to_numpy(dtype=float),
+        merged[y_columns].to_numpy(dtype=float),
+    )
+
+
+def compute_correlation(prices_df, salaries_df, start=None, end=None):
+    x_columns, y_columns, years, xs, ys = joined_rows(prices_df, salaries_df)
+    stats = CorrelationStats(x_columns, y_columns)
+    for year, x, y in zip(years, xs, ys):
+        stats.append(year, x, y)
+    return stats.correlation(start, end)
+
+
+def hash_rows(hasher, frame, columns, start, stop):
+    """Feed rows start..stop of `columns` to `hasher`; hashing a prefix in pieces gives the same digest."""
+    values = np.ascontiguousarray(frame[columns].iloc[start:stop].to_numpy(dtype=float))
+    hasher.update(values.tobytes())
+    return hasher
+
+
+class CorrelationService:
+    """CorrelationStats kept in step with the prices and salaries datasets.
+
+    When either CSV changes, only the rows after the last joined year are
+    joined and appended; each snapshot's sorted year index finds them by
+    binary search. The rows up to that year are hashed and compared with
+    the hash taken when they were joined. If one no longer matches (an
+    earlier row was edited) or the columns changed, the sums are rebuilt.
+    """
+
+    def __init__(self):
+        self._stats = None
+        self._versions = None
+        # (rows, digest) of the prices and salaries prefixes already joined
+        self._consumed = None
+        self._lock = threading.Lock()
+
+    def stats(self):
+        prices = get_dataset("prices")
+        salaries = get_dataset("salaries")
+        versions = (prices.version, salaries.version)
+        with self._lock:
+            if versions != self._versions:
+                self._stats = self._sync(prices, salaries)
+                self._versions = versions
+            return self._stats
+
+    @timed("correlation_sync")
+    def _sync(self, prices, salaries):
+        x_columns = numeric_columns(prices.frame)
+        y_columns = numeric_columns(salaries.frame)
+        snapshots = tuple(
+            (snapshot, [c for c in KEY_COLUMNS if c in snapshot.frame.columns] + columns)
+            for snapshot, columns in ((prices, x_columns), (salaries, y_columns))
+        )
+
+        def rows_through(snapshot, year):
+            return int(np.searchsorted(snapshot.years, year, side="right")) if year is not None else 0
+
+        stats = self._stats
+        hashers = None
+        if stats is not None and stats.x_columns == x_columns and stats.y_columns == y_columns:
+            # Hash what the joined years cover now; it must be what was joined before
+            hashers = []
+            for (snapshot, columns), consumed in zip(snapshots, self._consumed):
+                rows = rows_through(snapshot, stats.last_year)
+                hasher = hash_rows(hashlib.sha1(), snapshot.frame, columns, 0, rows)
+                if (rows, hasher.hexdigest()) != consumed:
+                    hashers = None
+                    break
+                hashers.append(hasher)
+        if hashers is None:
+            stats = CorrelationStats(x_columns, y_columns)
+            hashers = [hashlib.sha1(), hashlib.sha1()]
+
+        # Only the rows after the last joined year are merged. The frames are
+        # sorted by year, so all of a year's rows fall on the same side.
+        starts = [rows_through(snapshot, stats.last_year) for snapshot, _ in snapshots]
+        _, _, years, xs, ys = joined_rows(
+            prices.frame.iloc[starts[0]:], salaries.frame.iloc[starts[1]:], x_columns, y_columns
+        )
+        for year, x, y in zip(years, xs, ys):
+            stats.append(year, x, y)
+
+        # Extend the prefix hashes over the rows now covered, without rehashing the old ones
+        self._consumed = []
+        for (snapshot, columns), hasher, start in zip(snapshots, hashers, starts):
+            stop = rows_through(snapshot, stats.last_year)
+            self._consumed.append((stop, hash_rows(hasher, snapshot.frame, columns, start, stop).hexdigest()))
+        return stats
+
+
+CORRELATION = CorrelationService()
+
+
+def get_correlation(start=None, end=None):
+    stats = CORRELATION.stats()
+    return {
+        "correlation": stats.correlation(start, end),
+        "n": stats.count(start, end),
+        "start": start,
+        "end": end,
+    }
+
+
+def get_rolling_correlation(window):
+    return {"window": window, "rolling": CORRELATION.stats().rolling(window)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the columnar copies of the datasets")
+    parser.add_argument("command", choices=["build", "status"])
+    parser.add_argument("datasets", nargs="*", help=f"default: {', '.join(DATASETS)}")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the store is fresh")
+    args = parser.parse_args()
+
+    names = args.datasets or list(DATASETS)
+    unknown = set(names) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    for name in names:
+        path = DATASETS[name].path
+        fresh = read_columnar_header(path) is not None
+        if args.command == "status":
+            print(f"{name}: {'fresh' if fresh else 'stale or missing'} ({columnar_dir(path)})")
+        elif fresh and not args.force:
+            print(f"{name}: up to date")
+        else:
+            header = build_columnar(path)
+            print(f"{name}: wrote {header['rows']} rows x {len(header['columns'])} columns to {columnar_dir(path)}")
+
 
-def compute_correlation(prices_df, salaries_df):
-    merged = pd.merge(prices_df, salaries_df, on="year")
-    return merged.corr(numeric_only=True)["salary"].to_dict()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Static snapshots of the /api responses, written at build time.
+
+    python -m utils.export                 # prices, salaries, correlation
+    python -m utils.export --window 3      # plus /api/correlation?window=3
+
+Each response is written to static/data/ as <name>.<hash>.json, where the
+hash is taken from the content, next to .json.gz (and .json.br when brotli
+is installed) copies compressed ahead of time. manifest.json maps each name
+to its current file and records the CSV versions the files were built from.
+
+The hashed files never change, so they can be cached for good by browsers
+and by any static server or CDN (nginx `gzip_static on` picks up the .gz).
+The app serves them from memory too: /api/* without query arguments sends
+the export as long as the CSVs still match the manifest.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from utils.data_utils import DATASETS, csv_version, get_correlation, get_dataset, get_rolling_correlation
+from utils.http_cache import MIN_COMPRESS_SIZE, Payload
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+EXPORT_DIR = "static/data"
+MANIFEST = "manifest.json"
+HASH_LENGTH = 16
+
+# <name>.<hash>.json, optionally followed by .gz or .br
+EXPORT_FILE = re.compile(r"^([\w-]+)\.([0-9a-f]+)\.json(\.gz|\.br)?$")
+
+
+def window_name(window):
+    return f"correlation-window-{window}"
+
+
+def render_exports(windows=()):
+    """{name: JSON bytes} for every exported response."""
+    bodies = {name: get_dataset(name).json for name in DATASETS}
+    # Sorted keys, like the app's JSON provider, so the export reads the same as the live response
+    bodies["correlation"] = json.dumps(get_correlation(), sort_keys=True).encode()
+    for window in windows:
+        bodies[window_name(window)] = json.dumps(get_rolling_correlation(window), sort_keys=True).encode()
+    return bodies
+
+
+def write_file(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(out_dir=EXPORT_DIR):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def export(out_dir=EXPORT_DIR, windows=()):
+    """Write every response and a new manifest; returns the manifest.
+
+    Files that haven't changed keep their name and are not rewritten. The
+    previous manifest's files are kept, so pages loaded before the export
+    can still fetch them; anything older is removed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    # Versions are taken before rendering, so a CSV edited meanwhile makes the export stale, not wrong
+    sources = {name: list(csv_version(dataset.path)) for name, dataset in DATASETS.items()}
+    files = {}
+    for name, body in render_exports(windows).items():
+        digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        filename = f"{name}.{digest}.json"
+        encodings = []
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encodings.append(("gzip", ".gz", lambda: gzip.compress(body, 9, mtime=0)))
+            if brotli is not None:
+                encodings.append(("br", ".br", lambda: brotli.compress(body)))
+        for _, suffix, compress in [(None, "", lambda: body)] + encodings:
+            path = os.path.join(out_dir, filename + suffix)
+            if not os.path.exists(path):
+                write_file(path, compress())
+        files[name] = {
+            "file": filename,
+            "hash": digest,
+            "bytes": len(body),
+            "encodings": [encoding for encoding, _, _ in encodings],
+        }
+
+    previous = read_manifest(out_dir)
+    manifest = {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sources": sources,
+        "files": files,
+    }
+    write_file(os.path.join(out_dir, MANIFEST), json.dumps(manifest, indent=2).encode())
+
+    keep = {entry["file"] for entry in files.values()}
+    if previous is not None:
+        keep |= {entry["file"] for entry in previous.get("files", {}).values()}
+    for filename in os.listdir(out_dir):
+        match = EXPORT_FILE.match(filename)
+        if match and f"{match.group(1)}.{match.group(2)}.json" not in keep:
+            os.unlink(os.path.join(out_dir, filename))
+    return manifest
+
+
+
+class StaticExports:
+    """The exported responses as Payloads, for the app to send from memory.
+
+    The manifest is re-read when it changes. An entry is only handed out
+    while every CSV still has the version recorded in the manifest; after
+    an edit the app builds the response live until the next export.
+    """
+
+    def __init__(self, out_dir=EXPORT_DIR):
+        self.out_dir = out_dir
+        self._loaded = (None, None, {})  # manifest version, manifest, {name: Payload}
+        self._lock = threading.Lock()
+
+    def _state(self):
+        try:
+            stat = os.stat(os.path.join(self.out_dir, MANIFEST))
+            version = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        loaded = self._loaded
+        if loaded[0] == version:
+            return loaded
+        with self._lock:
+            if self._loaded[0] != version:
+                manifest = read_manifest(self.out_dir) if version is not None else None
+                self._loaded = (version, manifest, {})
+            return self._loaded
+
+    def _read(self, entry, suffix):
+        try:
+            with open(os.path.join(self.out_dir, entry["file"] + suffix), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _payload(self, name, manifest, payloads):
+        payload = payloads.get(name)
+        if payload is None:
+            entry = manifest["files"][name]
+            body = self._read(entry, "")
+            if body is None:
+                return None
+            encodings = entry.get("encodings", [])
+            mtime_ns = max(version[0] for version in manifest["sources"].values())
+            payload = payloads[name] = Payload(
+                body=body,
+                gzip=self._read(entry, ".gz") if "gzip" in encodings else None,
+                br=self._read(entry, ".br") if "br" in encodings else None,
+                etag=entry["hash"],
+                last_modified=datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc),
+            )
+        return payload
+
+    def payload(self, name):
+        """The exported response `name`, or None when it is missing or the CSVs have changed."""
+        _, manifest, payloads = self._state()
+        if manifest is None or name not in manifest.get("files", {}):
+            return None
+        for dataset, version in manifest["sources"].items():
+            if dataset not in DATASETS or csv_version(DATASETS[dataset].path) != tuple(version):
+                return None
+        return self._payload(name, manifest, payloads)
+
+    def file_payload(self, filename):
+        """The payload stored as `filename` in the current manifest, stale or not, or None.
+
+        A hashed file's content never changes, so it is safe to send
+        whatever the CSVs look like now.
+        """
+        _, manifest, payloads = self._state()
+        if manifest is None:
+            return None
+        for name, entry in manifest.get("files", {}).items():
+            if entry["file"] == filename:
+                return self._payload(name, manifest, payloads)
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the /api responses as static, precompressed JSON")
+    parser.add_argument("--out", default=EXPORT_DIR, help=f"output directory (default: {EXPORT_DIR})")
+    parser.add_argument("--window", type=int, action="append", default=[],
+                        help="also export /api/correlation?window=N; repeatable")
+    args = parser.parse_args()
+    if any(window < 2 for window in args.window):
+        parser.error("window must be at least 2 years")
+
+    manifest = export(args.out, args.window)
+    for name, entry in manifest["files"].items():
+        encodings = ", ".join(entry["encodings"]) or "uncompressed only"
+        print(f"{name}: {os.path.join(args.out, entry['file'])} ({entry['bytes']} bytes; {encodings})")
+
+
+if __name__ == "__main__":
+    main()
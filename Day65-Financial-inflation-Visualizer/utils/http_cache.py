@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+from utils.instrumentation import timed
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Compressing below this size costs more than it saves
+MIN_COMPRESS_SIZE = 512
+MAX_PAYLOADS = 256
+# Seconds a content-hashed response may be cached (one year)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# body: the JSON bytes; gzip/br: the same body precompressed (None when not worth it)
+# etag: content hash of body; last_modified: aware datetime of the newest source file
+Payload = namedtuple("Payload", ["body", "gzip", "br", "etag", "last_modified"])
+
+
+@timed("encode")
+def make_payload(body, mtime_ns):
+    compress = len(body) >= MIN_COMPRESS_SIZE
+    return Payload(
+        body=body,
+        gzip=gzip.compress(body, 9, mtime=0) if compress else None,
+        br=brotli.compress(body) if compress and brotli is not None else None,
+        etag=hashlib.sha256(body).hexdigest()[:32],
+        last_modified=datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc),
+    )
+
+
+class PayloadCache:
+    """Payloads (or tuples holding one) kept least recently used first out.
+
+    Keys carry the versions of the files a payload was built from, so a
+    changed file simply stops matching and its old entries age out.
+    """
+
+    def __init__(self, size=MAX_PAYLOADS):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                return payload
+        payload = build()
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return payload
+
+
+def send_payload(payload, immutable=False):
+    """Serve a payload in the best encoding the client accepts, or 304 if it has it already.
+
+    immutable=True is for content-hashed URLs, whose body never changes:
+    clients may then keep it for a year without checking back.
+    """
+    encodings = request.accept_encodings
+    if payload.br is not None and encodings["br"]:
+        body, encoding = payload.br, "br"
+    elif payload.gzip is not None and encodings["gzip"]:
+        body, encoding = payload.gzip, "gzip"
+    else:
+        body, encoding = payload.body, None
+
+    response = Response(body, mimetype="application/json")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+        # Each encoding is a different byte stream, so it gets its own tag
+        response.set_etag(f"{payload.etag}-{encoding}")
+    else:
+        response.set_etag(payload.etag)
+    response.last_modified = payload.last_modified
+    response.vary.add("Accept-Encoding")
+    if immutable:
+        response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        # Let browsers keep the body but check back every time; a match costs a 304
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,147 @@
+"""Request and stage timing for the app, exposed in Prometheus text format.
+
+    from utils.instrumentation import instrument, timed
+
+    instrument(app)             # per-route latency, bytes in/out, GET /metrics
+
+    @timed("query")             # or: with timed("query"): ...
+    def query(...): ...
+
+Stage timings are labelled with the route of the request they ran in (empty
+outside a request). Metrics live in the process that recorded them, so each
+gunicorn worker serves its own /metrics.
+
+This is the PDF merger's instrumentation (Day36) cut down to what this app
+needs: its responses are whole byte strings, so there is no streamed-body
+accounting, and there is no sampling profiler.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+# Latency histogram upper bounds in seconds (+Inf is implied)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_request_duration_seconds": "Time from request start until the response was ready",
+    "http_request_bytes_total": "Request body bytes received",
+    "http_response_bytes_total": "Response body bytes sent",
+    "stage_duration_seconds": "Time spent in an instrumented stage",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Histograms and counters keyed by (metric name, sorted label pairs)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = Counter()
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def render(self):
+        """Everything recorded so far in Prometheus text exposition format."""
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                header(name, "histogram")
+                cumulative = 0
+                bounds = [repr(float(bound)) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+REGISTRY = Registry()
+
+
+def current_route():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return ""
+
+
+@contextmanager
+def timed(stage):
+    """Record how long the block (or decorated function) takes as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe("stage_duration_seconds", {"route": current_route(), "stage": stage},
+                         time.perf_counter() - start)
+
+
+def instrument(app):
+    """Time every request by route and serve the results at /metrics."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record(response):
+        start = g.pop("metrics_start", None)
+        route = current_route() or "unmatched"
+        REGISTRY.inc("http_request_bytes_total", {"route": route}, request.content_length or 0)
+        REGISTRY.inc("http_response_bytes_total", {"route": route}, response.content_length or 0)
+        if start is not None:
+            labels = {"method": request.method, "route": route, "status": str(response.status_code)}
+            REGISTRY.observe("http_request_duration_seconds", labels, time.perf_counter() - start)
+        return response
+
+    def metrics():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics)
+    return app
@@ -1,12 +1,16 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
-from utils import load_data
+from utils import build_dashboard_data, country_index, dashboard_metrics, file_version
+from charts import bar_figure, comparison_figures, scatter_figure
 
-# Load Data
-df = load_data("../data/food_data.csv")
+DATA_FILE = "../data/food_data.csv"
+
+# Load Data (cached; reloaded only when the CSV changes)
+version = file_version(DATA_FILE)
+data = build_dashboard_data(DATA_FILE, version)
+df = data["df"]
+# Summed over the cached frame once per file version
+metrics = dashboard_metrics(DATA_FILE, version)
 
 # Page Configuration
 st.set_page_config(
@@ -145,22 +149,26 @@ st.markdown(
 st.markdown('<div class="title">🍽️ Food Waste vs Hunger Gap Visualizer</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle">Explore the paradox of wasted food vs global hunger</div>', unsafe_allow_html=True)
 
-# Calculate metrics for the cards
-total_waste = df["Food_Waste_Million_Tons"].sum()
-total_hunger = df["Hungry_Population_Million"].sum()
-avg_waste_per_country = df["Food_Waste_Million_Tons"].mean()
-avg_hunger_per_country = df["Hungry_Population_Million"].mean()
+# Metrics for the cards (precomputed per file version)
+total_waste = metrics["total_waste"]
+total_hunger = metrics["total_hunger"]
+avg_waste_per_country = metrics["avg_waste"]
+avg_hunger_per_country = metrics["avg_hunger"]
+
+def card_value(value, unit):
+    # A column with no values at all has NaN metrics
+    return "—" if pd.isna(value) else f"{value:.1f}M {unit}"
 
 # Create metrics cards
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.markdown(f'<div class="metric-card"><h3>Total Food Waste</h3><h2>{total_waste:.1f}M Tons</h2></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="metric-card"><h3>Total Food Waste</h3><h2>{card_value(total_waste, "Tons")}</h2></div>', unsafe_allow_html=True)
 with col2:
-    st.markdown(f'<div class="metric-card"><h3>Total Hungry Population</h3><h2>{total_hunger:.1f}M People</h2></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="metric-card"><h3>Total Hungry Population</h3><h2>{card_value(total_hunger, "People")}</h2></div>', unsafe_allow_html=True)
 with col3:
-    st.markdown(f'<div class="metric-card"><h3>Avg Waste per Country</h3><h2>{avg_waste_per_country:.1f}M Tons</h2></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="metric-card"><h3>Avg Waste per Country</h3><h2>{card_value(avg_waste_per_country, "Tons")}</h2></div>', unsafe_allow_html=True)
 with col4:
-    st.markdown(f'<div class="metric-card"><h3>Avg Hunger per Country</h3><h2>{avg_hunger_per_country:.1f}M People</h2></div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="metric-card"><h3>Avg Hunger per Country</h3><h2>{card_value(avg_hunger_per_country, "People")}</h2></div>', unsafe_allow_html=True)
 
 # Create tabs for different visualizations
 tab1, tab2, tab3, tab4 = st.tabs(["Scatter Plot", "Bar Chart", "Country Comparison", "Raw Data"])
@@ -171,37 +179,7 @@ with tab1:
     # Add animation option
     animate = st.checkbox("Animate by Country", value=False)
     
-    if animate:
-        fig1 = px.scatter(
-            df, 
-            x="Food_Waste_Million_Tons", 
-            y="Hungry_Population_Million", 
-            color="Country",
-            size="Hungry_Population_Million",
-            hover_name="Country",
-            size_max=60,
-            animation_frame="Country",
-            template="plotly_dark",
-            title="Animated View of Food Waste vs Hungry Population"
-        )
-    else:
-        fig1 = px.scatter(
-            df, 
-            x="Food_Waste_Million_Tons", 
-            y="Hungry_Population_Million", 
-            color="Country",
-            size="Hungry_Population_Million",
-            hover_name="Country",
-            size_max=60,
-            template="plotly_dark",
-            title="Food Waste vs Hungry Population"
-        )
-    
-    fig1.update_layout(
-        plot_bgcolor='rgba(0, 0, 0, 0.1)',
-        paper_bgcolor='rgba(0, 0, 0, 0)',
-        font_color="#e0e0e0"
-    )
+    fig1 = scatter_figure(DATA_FILE, version, animate)
     st.plotly_chart(fig1, use_container_width=True)
 
 with tab2:
@@ -210,26 +188,7 @@ with tab2:
     # Sort options
     sort_by = st.radio("Sort by:", ["Food Waste", "Hungry Population"], horizontal=True)
     
-    if sort_by == "Food Waste":
-        df_sorted = df.sort_values(by="Food_Waste_Million_Tons", ascending=False)
-    else:
-        df_sorted = df.sort_values(by="Hungry_Population_Million", ascending=False)
-    
-    fig2 = px.bar(
-        df_sorted,
-        x="Country",
-        y=["Food_Waste_Million_Tons", "Hungry_Population_Million"],
-        barmode="group",
-        template="plotly_dark",
-        title="Food Waste vs Hungry Population by Country",
-        labels={"value": "Millions", "variable": "Metric"}
-    )
-    
-    fig2.update_layout(
-        plot_bgcolor='rgba(0, 0, 0, 0.1)',
-        paper_bgcolor='rgba(0, 0, 0, 0)',
-        font_color="#e0e0e0"
-    )
+    fig2 = bar_figure(DATA_FILE, version, sort_by)
     st.plotly_chart(fig2, use_container_width=True)
 
 with tab3:
@@ -238,69 +197,15 @@ with tab3:
     # Country selector
     countries = st.multiselect(
         "Select countries to compare:",
-        options=df["Country"].unique(),
-        default=df["Country"].unique()[:3]
+        options=list(df["Country"].unique()),
+        default=list(df["Country"].unique()[:3])
     )
     
     if countries:
-        filtered_df = df[df["Country"].isin(countries)]
-        
-        # Create subplots
-        fig = make_subplots(
-            rows=1, cols=2,
-            subplot_titles=("Food Waste (Million Tons)", "Hungry Population (Million)")
-        )
-        
-        fig.add_trace(
-            go.Bar(
-                x=filtered_df["Country"],
-                y=filtered_df["Food_Waste_Million_Tons"],
-                name="Food Waste",
-                marker_color="#4CAF50"
-            ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Bar(
-                x=filtered_df["Country"],
-                y=filtered_df["Hungry_Population_Million"],
-                name="Hungry Population",
-                marker_color="#FF9800"
-            ),
-            row=1, col=2
-        )
-        
-        fig.update_layout(
-            template="plotly_dark",
-            showlegend=False,
-            height=500,
-            plot_bgcolor='rgba(0, 0, 0, 0.1)',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            font_color="#e0e0e0"
-        )
+        fig, ratio_fig = comparison_figures(DATA_FILE, version, tuple(countries))
         
         st.plotly_chart(fig, use_container_width=True)
         
-        # Calculate ratios
-        filtered_df = filtered_df.copy()
-        filtered_df["Waste_to_Hunger_Ratio"] = filtered_df["Food_Waste_Million_Tons"] / filtered_df["Hungry_Population_Million"]
-        
-        ratio_fig = px.bar(
-            filtered_df,
-            x="Country",
-            y="Waste_to_Hunger_Ratio",
-            color="Country",
-            title="Food Waste to Hunger Ratio (Higher = More Waste Relative to Hunger)",
-            template="plotly_dark"
-        )
-        
-        ratio_fig.update_layout(
-            plot_bgcolor='rgba(0, 0, 0, 0.1)',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            font_color="#e0e0e0"
-        )
-        
         st.plotly_chart(ratio_fig, use_container_width=True)
     else:
         st.info("Please select at least one country to compare.")
@@ -310,31 +215,44 @@ with tab4:
     
     # Add search and filter options
     search_term = st.text_input("Search for a country:")
+    rows = country_index(DATA_FILE, version).search(search_term)
     
-    if search_term:
-        filtered_data = df[df["Country"].str.contains(search_term, case=False)]
-    else:
-        filtered_data = df
-    
-    # Show dataframe with gradient
-    st.dataframe(
-        filtered_data.style.background_gradient(cmap="YlOrRd", subset=["Food_Waste_Million_Tons", "Hungry_Population_Million"]),
-        use_container_width=True
+    # Only the visible page is sliced and styled
+    page_size = st.selectbox("Rows per page:", [25, 50, 100, 250], index=1)
+    pages = max((len(rows) - 1) // page_size + 1, 1)
+    page = st.number_input(
+        f"Page (of {pages}):",
+        min_value=1, max_value=pages, value=1, step=1,
+        key=f"page-{search_term}-{page_size}"
     )
+    page_data = df.iloc[rows[(page - 1) * page_size:page * page_size]]
+    st.caption(f"Showing {len(page_data)} of {len(rows):,} rows")
     
-    # Download button
+    # Show dataframe with gradient (colored on the full data's range)
+    styled = page_data.style
+    for column, (low, high) in metrics["ranges"].items():
+        if pd.isna(low):
+            continue  # nothing to color
+        styled = styled.background_gradient(cmap="YlOrRd", subset=[column], vmin=low, vmax=high)
+    st.dataframe(styled, use_container_width=True)
+    
+    # Download button; the CSV is only built once asked for
     @st.cache_data
-    def convert_df_to_csv(df):
-        return df.to_csv(index=False).encode('utf-8')
+    def convert_df_to_csv(file_path, version, search_term):
+        rows = country_index(file_path, version).search(search_term)
+        return build_dashboard_data(file_path, version)["df"].iloc[rows].to_csv(index=False).encode('utf-8')
     
-    csv = convert_df_to_csv(filtered_data)
+    export_key = (version, search_term)
+    if st.button("Prepare CSV download"):
+        st.session_state["csv_export"] = export_key
     
-    st.download_button(
-        label="Download data as CSV",
-        data=csv,
-        file_name="food_waste_data.csv",
-        mime="text/csv",
-    )
+    if st.session_state.get("csv_export") == export_key:
+        st.download_button(
+            label="Download data as CSV",
+            data=convert_df_to_csv(DATA_FILE, version, search_term),
+            file_name="food_waste_data.csv",
+            mime="text/csv",
+        )
 
 # Add footer
 st.markdown("---")
@@ -0,0 +1,131 @@
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+from utils import HUNGER, RATIO, SORT_COLUMNS, WASTE, build_dashboard_data
+
+# Figures are cached on (file path, file version, widget state), so a rerun
+# with the same inputs reuses the figure instead of rebuilding it. The data
+# is looked up from build_dashboard_data's cache, not passed in and hashed.
+
+# Above this many points the scatter is drawn with WebGL (scattergl)
+WEBGL_POINTS = 2_000
+# Above this many points the scatter becomes a 2D density heatmap
+DENSITY_POINTS = 50_000
+# Above this many countries, coloring (one trace per country) and animating
+# (one frame per country) are dropped
+MAX_COLORED_COUNTRIES = 50
+# The bar chart shows at most this many countries
+MAX_BARS = 50
+
+def style(fig):
+    fig.update_layout(
+        plot_bgcolor='rgba(0, 0, 0, 0.1)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font_color="#e0e0e0"
+    )
+    return fig
+
+def per_country(df):
+    """One row per country, summing regions/years when the data has several."""
+    if df["Country"].is_unique:
+        return df
+    totals = df.groupby("Country", as_index=False, sort=False, observed=True)[[WASTE, HUNGER]].sum()
+    totals[RATIO] = totals[WASTE] / totals[HUNGER]
+    return totals
+
+@st.cache_data(show_spinner=False)
+def scatter_figure(file_path, version, animate):
+    df = build_dashboard_data(file_path, version)["df"]
+    points = len(df)
+
+    if points > DENSITY_POINTS:
+        fig = px.density_heatmap(
+            df,
+            x=WASTE,
+            y=HUNGER,
+            nbinsx=80,
+            nbinsy=80,
+            template="plotly_dark",
+            title=f"Food Waste vs Hungry Population (density of {points:,} points)"
+        )
+        return style(fig)
+
+    colored = df["Country"].nunique() <= MAX_COLORED_COUNTRIES
+    options = dict(
+        x=WASTE,
+        y=HUNGER,
+        color="Country" if colored else None,
+        size=HUNGER,
+        hover_name="Country",
+        size_max=60,
+        render_mode="webgl" if points > WEBGL_POINTS else "auto",
+        template="plotly_dark",
+    )
+    if animate and colored:
+        fig = px.scatter(df, animation_frame="Country",
+                         title="Animated View of Food Waste vs Hungry Population", **options)
+    else:
+        fig = px.scatter(df, title="Food Waste vs Hungry Population", **options)
+    return style(fig)
+
+@st.cache_data(show_spinner=False)
+def bar_figure(file_path, version, sort_by):
+    df = build_dashboard_data(file_path, version)["df"]
+    df_sorted = per_country(df).sort_values(by=SORT_COLUMNS[sort_by], ascending=False).head(MAX_BARS)
+
+    fig = px.bar(
+        df_sorted,
+        x="Country",
+        y=[WASTE, HUNGER],
+        barmode="group",
+        template="plotly_dark",
+        title="Food Waste vs Hungry Population by Country",
+        labels={"value": "Millions", "variable": "Metric"}
+    )
+    return style(fig)
+
+@st.cache_data(show_spinner=False)
+def comparison_figures(file_path, version, countries):
+    """The side-by-side bars and the ratio chart for a tuple of countries."""
+    df = build_dashboard_data(file_path, version)["df"]
+    # Plain strings, so the charts don't carry every Country category along
+    filtered_df = per_country(df[df["Country"].isin(countries)]).astype({"Country": str})
+
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=("Food Waste (Million Tons)", "Hungry Population (Million)")
+    )
+    fig.add_trace(
+        go.Bar(
+            x=filtered_df["Country"],
+            y=filtered_df[WASTE],
+            name="Food Waste",
+            marker_color="#4CAF50"
+        ),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=filtered_df["Country"],
+            y=filtered_df[HUNGER],
+            name="Hungry Population",
+            marker_color="#FF9800"
+        ),
+        row=1, col=2
+    )
+    fig.update_layout(
+        template="plotly_dark",
+        showlegend=False,
+        height=500
+    )
+
+    ratio_fig = px.bar(
+        filtered_df,
+        x="Country",
+        y=RATIO,
+        color="Country",
+        title="Food Waste to Hunger Ratio (Higher = More Waste Relative to Hunger)",
+        template="plotly_dark"
+    )
+    return style(fig), style(ratio_fig)
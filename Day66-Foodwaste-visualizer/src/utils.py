@@ -1,4 +1,183 @@
+import os
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+WASTE = "Food_Waste_Million_Tons"
+HUNGER = "Hungry_Population_Million"
+RATIO = "Waste_to_Hunger_Ratio"
+
+# Declared column types. Country repeats a handful of names across every
+# row, so it is stored once per name; float32 halves the metric columns.
+SCHEMA = {"Country": "category", WASTE: "float32", HUNGER: "float32"}
+# Rows per chunk when streaming aggregates over the CSV
+CHUNK_ROWS = 250_000
+
+# Length of the substrings indexed for country search
+NGRAM = 3
+
+# Bar chart sort choices -> column sorted on (descending)
+SORT_COLUMNS = {"Food Waste": WASTE, "Hungry Population": HUNGER}
+
+def sidecar_path(file_path: str):
+    return os.path.splitext(file_path)[0] + ".feather"
+
+def read_sidecar(file_path: str, columns=None):
+    """`columns` (default: all the CSV's) from the Feather copy, or None.
+
+    None means the copy is missing, older than the CSV, lacks one of the
+    columns, or pyarrow isn't installed.
+    """
+    path = sidecar_path(file_path)
+    try:
+        if os.stat(path).st_mtime_ns < os.stat(file_path).st_mtime_ns:
+            return None
+        if columns is None:
+            columns = list(pd.read_csv(file_path, nrows=0).columns)
+        return pd.read_feather(path, columns=columns)
+    except (OSError, ImportError, KeyError, ValueError):
+        return None
+
+def write_sidecar(file_path: str, df):
+    path = sidecar_path(file_path)
+    tmp_path = f"{path}.tmp"
+    try:
+        df.to_feather(tmp_path)
+    except (OSError, ImportError):
+        return
+    os.replace(tmp_path, path)
+
+def load_data(file_path: str, columns=None, sidecar: bool = False):
+    """Read the CSV with SCHEMA's dtypes, keeping only `columns` if given.
+
+    With sidecar=True a Feather copy next to the CSV is read instead when
+    it is newer and has the columns, and is rewritten after every CSV
+    read. That needs pyarrow; without it the CSV is always parsed.
+    """
+    columns = list(columns) if columns else None
+    if sidecar:
+        df = read_sidecar(file_path, columns)
+        if df is not None:
+            return df
+    dtype = {c: t for c, t in SCHEMA.items() if columns is None or c in columns}
+    df = pd.read_csv(file_path, usecols=columns, dtype=dtype)
+    if sidecar:
+        write_sidecar(file_path, df)
+    return df
+
+def summarize(chunks):
+    """Metric-card totals/means and column ranges over an iterable of frames.
+
+    Missing values are skipped, like pandas' sum/mean/min/max. A column
+    with no values at all gets NaN for its total, mean and range.
+    """
+    counts = dict.fromkeys((WASTE, HUNGER), 0)
+    totals = dict.fromkeys((WASTE, HUNGER), 0.0)
+    lows = dict.fromkeys((WASTE, HUNGER), np.inf)
+    highs = dict.fromkeys((WASTE, HUNGER), -np.inf)
+    for chunk in chunks:
+        for column in (WASTE, HUNGER):
+            # Add up float32 values in float64 so large totals keep their precision
+            values = chunk[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if values.size:
+                counts[column] += values.size
+                totals[column] += values.sum()
+                lows[column] = min(lows[column], values.min())
+                highs[column] = max(highs[column], values.max())
+
+    def known(column, value):
+        return value if counts[column] else float("nan")
+
+    return {
+        "total_waste": known(WASTE, totals[WASTE]),
+        "total_hunger": known(HUNGER, totals[HUNGER]),
+        "avg_waste": known(WASTE, totals[WASTE] / max(counts[WASTE], 1)),
+        "avg_hunger": known(HUNGER, totals[HUNGER] / max(counts[HUNGER], 1)),
+        "ranges": {column: (known(column, lows[column]), known(column, highs[column])) for column in (WASTE, HUNGER)},
+    }
+
+def stream_metrics(file_path: str, chunksize: int = CHUNK_ROWS):
+    """summarize() over the CSV a chunk at a time, reading only the metric columns.
+
+    Memory stays at one chunk however large the file is, for callers that
+    need the totals without loading the frame (the dashboard has it, and
+    uses dashboard_metrics).
+    """
+    chunks = pd.read_csv(file_path, usecols=[WASTE, HUNGER], dtype=SCHEMA, chunksize=chunksize)
+    return summarize(chunks)
+
+def file_version(file_path: str):
+    """(mtime_ns, size) of the file; changes whenever the file is rewritten."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(show_spinner=False)
+def build_dashboard_data(file_path: str, version):
+    """Everything the dashboard derives from the CSV, computed once per file version.
+
+    `version` is only there to key the cache: a rewritten file gets a new
+    version and is loaded again, while widget reruns hit the cache. The
+    result is shared by every session and rerun, not copied, so callers
+    must not modify the frame.
+    """
+    df = load_data(file_path, columns=["Country", WASTE, HUNGER], sidecar=True)
+    df[RATIO] = df[WASTE] / df[HUNGER]
+    return {"df": df}
+
+@st.cache_data(show_spinner=False)
+def dashboard_metrics(file_path: str, version):
+    """Metric-card values and column ranges, once per file version.
+
+    Taken from the cached frame, which the dashboard loads anyway, so the
+    CSV isn't parsed a second time. Only a few numbers come back, so
+    cache_data's per-call copy costs nothing.
+    """
+    return summarize([build_dashboard_data(file_path, version)["df"]])
+
+def ngrams(text: str):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+class CountryIndex:
+    """Case-insensitive substring search over the Country column.
+
+    Only the distinct names are indexed, by their lowercase trigrams, and
+    each name maps to the row positions that hold it. A search intersects
+    the trigram sets of the term and then confirms the few candidates, so
+    its cost follows the number of names, not the number of rows.
+    """
+
+    def __init__(self, countries: pd.Series):
+        codes, names = pd.factorize(countries)
+        self.names = [str(name).lower() for name in names]
+        self.total = len(countries)
+
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        self.rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(names))]
+
+        self.grams = defaultdict(set)
+        for i, name in enumerate(self.names):
+            for gram in ngrams(name):
+                self.grams[gram].add(i)
+
+    def search(self, term: str):
+        """Sorted row positions whose country contains `term`; every row when it is empty."""
+        term = term.lower()
+        if not term:
+            return np.arange(self.total)
+        if len(term) >= NGRAM:
+            sets = sorted((self.grams.get(gram, set()) for gram in ngrams(term)), key=len)
+            candidates = set.intersection(*sets)
+        else:
+            candidates = range(len(self.names))
+        matches = [self.rows[i] for i in candidates if term in self.names[i]]
+        if not matches:
+            return np.arange(0)
+        return np.sort(np.concatenate(matches))
 
-def load_data(file_path: str):
-    return pd.read_csv(file_path)
+@st.cache_resource(show_spinner=False)
+def country_index(file_path: str, version):
+    return CountryIndex(build_dashboard_data(file_path, version)["df"]["Country"])
@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+from utils import HUNGER, WASTE, summarize
+
+
+def test_summarize_skips_missing_values():
+    chunks = [
+        pd.DataFrame({WASTE: [4.0, np.nan], HUNGER: [10.0, 20.0]}, dtype="float32"),
+        pd.DataFrame({WASTE: [6.0, np.nan], HUNGER: [30.0, np.nan]}, dtype="float32"),
+    ]
+    summary = summarize(chunks)
+    frame = pd.concat(chunks)
+    assert summary["total_waste"] == pytest.approx(frame[WASTE].sum())
+    assert summary["avg_waste"] == pytest.approx(frame[WASTE].mean())  # 5.0, not 2.5
+    assert summary["avg_hunger"] == pytest.approx(frame[HUNGER].mean())
+    assert summary["ranges"][WASTE] == (4.0, 6.0)
+
+
+def test_summarize_all_missing_column_is_nan():
+    summary = summarize([pd.DataFrame({WASTE: [np.nan, np.nan], HUNGER: [1.0, 3.0]})])
+    assert math.isnan(summary["total_waste"])
+    assert math.isnan(summary["avg_waste"])
+    assert all(math.isnan(bound) for bound in summary["ranges"][WASTE])
+    assert summary["avg_hunger"] == 2.0